@@ -0,0 +1,75 @@
+"""Discovery of logger sticks on a subnet, as run by the config flow.
+
+Serves fake sticks on 127.0.0.2 and up, all on the same port the way sticks
+on a LAN share port 80, plus decoy web servers asking for a different realm,
+then probes the whole --network and reports the time taken and what was found.
+Unused loopback addresses refuse the connection at once, so --network can also
+point at a real LAN to measure the scan against hosts that never answer.
+
+    python -m benchmarks.discovery_bench --sticks 20 --decoys 5 --latency 0.05
+    python -m benchmarks.discovery_bench --sticks 0 --network 192.168.1.0/24 --port 80
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from custom_components.solis_wifi_data_logger.discovery import discoverLoggers,discoveryHosts
+
+from .fake_solis_stick import FakeSolisStick,add_stick_arguments,stick_config
+
+async def decoy(request:web.Request) -> web.Response:
+    #A router admin page, answers moniter.cgi with a challenge in its own realm
+    return web.Response(status=401,headers={"WWW-Authenticate":'Basic realm="Router"'})
+
+async def start_servers(sticks:int,decoys:int,port:int,args:argparse.Namespace) -> list[web.AppRunner]:
+    config=stick_config(args)
+    runners=[]
+
+    for index in range(sticks+decoys):
+        app=web.Application()
+        if index < sticks:
+            app.router.add_get("/{name}",FakeSolisStick(index,config).handle)
+        else:
+            app.router.add_get("/{name}",decoy)
+
+        runner=web.AppRunner(app,access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner,f"127.0.0.{index+2}",port).start()
+        runners.append(runner)
+
+    return runners
+
+async def run(args:argparse.Namespace) -> None:
+    runners=await start_servers(args.sticks,args.decoys,args.port,args)
+
+    try:
+        start=time.perf_counter()
+        loggers=await discoverLoggers(args.network,args.username,args.password,concurrency=args.concurrency,port=args.port)
+        elapsed=time.perf_counter()-start
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+    print(f"Probed {len(discoveryHosts(args.network))} addresses of {args.network} in {elapsed:.2f}s, found {len(loggers)} loggers")
+    for logger in loggers:
+        print(f"  {logger.url:<28}{logger.serialNumber or 'credentials rejected'}")
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Discover fake logger sticks on a loopback subnet")
+    parser.add_argument("--sticks",type=int,default=20,help="Fake sticks served on 127.0.0.2 and up")
+    parser.add_argument("--decoys",type=int,default=5,help="Web servers with another realm, after the sticks")
+    parser.add_argument("--network",default="127.0.0.0/24")
+    parser.add_argument("--port",type=int,default=18080)
+    parser.add_argument("--concurrency",type=int,default=128)
+    add_stick_arguments(parser)
+    args=parser.parse_args()
+
+    if args.sticks+args.decoys > 253:
+        parser.error("at most 253 sticks and decoys fit in 127.0.0.2 .. 127.0.0.254")
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
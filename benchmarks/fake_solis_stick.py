@@ -0,0 +1,257 @@
+"""Local stand-in for Solis Wifi Data Logger sticks.
+
+Serves inverter.cgi and moniter.cgi the way the stick does: ';' separated
+fields with a trailing ';\\r\\n', NUL padded to a fixed buffer size and
+protected by BasicAuth. Latency, jitter and a drop rate can be configured so
+the benchmarks can reproduce slow or flaky Wi-Fi links fully offline.
+
+With --v5-base-port every stick also answers Solarman V5 read input register
+requests on its own TCP port, addressed with its logger serial, from a Solis
+register map kept in step with the CGI payloads.
+
+    python -m benchmarks.fake_solis_stick --count 10 --base-port 18000 --latency 0.2 --jitter 0.05 --drop-rate 0.01
+    python -m benchmarks.fake_solis_stick --count 1 --base-port 18000 --v5-base-port 18899
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import random
+import struct
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from custom_components.solis_wifi_data_logger.solarman_v5 import (
+    modbusCrc,
+    V5_HEADER,
+    V5_START,
+    V5_END,
+    V5_CONTROL_REQUEST,
+    V5_CONTROL_RESPONSE,
+    V5_REQUEST_PAYLOAD,
+    MODBUS_READ_INPUT_REGISTERS
+)
+
+@dataclass
+class FakeStickConfig:
+    latency:float=0.0
+    jitter:float=0.0
+    drop_rate:float=0.0
+    truncate_rate:float=0.0
+    username:str="admin"
+    password:str="admin"
+    padding:int=512
+
+class FakeSolisStick:
+    """One simulated logger stick with its inverter"""
+
+    def __init__(self,index:int,config:FakeStickConfig) -> None:
+        self._config=config
+        self._random=random.Random(index)
+        self._authorization="Basic "+base64.b64encode(f"{config.username}:{config.password}".encode()).decode()
+
+        self.logger_serial=f"40{index:08d}"
+        self.inverter_serial=f"1031{index:012d}"
+        self.ip_address=f"10.0.{index // 250}.{index % 250 + 1}"
+        self.daily_power_yield=0.0
+        self.requests=0
+
+    def inverterPayload(self) -> bytes:
+        current_power=round(self._random.uniform(0,5000),1)
+        self.daily_power_yield=round(self.daily_power_yield+current_power/720000,1)
+
+        return self._payload([
+            self.inverter_serial,
+            "0E0010",
+            "F4",
+            f"{self._random.uniform(20,60):.1f}",
+            f"{current_power}",
+            f"{self.daily_power_yield}",
+            "d",
+            "NO"
+        ])
+
+    def inverterRegisters(self) -> dict[int,int]:
+        """Solis input registers 33000-33120, unlisted registers read as 0"""
+        current_power=round(self._random.uniform(0,5000))
+        self.daily_power_yield=round(self.daily_power_yield+current_power/720000,1)
+        total_power_yield=12345+int(self.daily_power_yield)
+
+        registers={33000:0xF4,33001:0x0E00,33029:total_power_yield >> 16,33030:total_power_yield & 0xFFFF}
+        registers.update(zip(range(33004,33020),struct.unpack(">16H",self.inverter_serial.encode().ljust(32,b"\x00"))))
+        registers[33035]=round(self.daily_power_yield*10)
+        registers[33079],registers[33080]=current_power >> 16,current_power & 0xFFFF
+        registers[33093]=round(self._random.uniform(20,60)*10)
+        return registers
+
+    def solarmanV5Response(self,request:bytes) -> bytes|None:
+        """Answer a V5 read input registers request, None when it is not addressed to this stick"""
+        _,length,control,sequence,serial=V5_HEADER.unpack_from(request)
+        if control != V5_CONTROL_REQUEST or serial != int(self.logger_serial) or sum(request[1:-2]) & 0xFF != request[-2]:
+            return None
+
+        modbus=request[V5_HEADER.size+V5_REQUEST_PAYLOAD.size:-2]
+        slave,function,start,count=struct.unpack_from(">BBHH",modbus)
+        if function != MODBUS_READ_INPUT_REGISTERS or modbusCrc(modbus[:-2]) != int.from_bytes(modbus[-2:],"little"):
+            return None
+
+        registers=self.inverterRegisters()
+        answer=struct.pack(f">BBB{count}H",slave,function,count*2,*(registers.get(address,0) for address in range(start,start+count)))
+        answer+=struct.pack("<H",modbusCrc(answer))
+
+        #Frame type, status, then the stick's working, power on and offset times
+        payload=struct.pack("<BBIII",0x02,0x01,self.requests,self.requests,0)+answer
+        frame=V5_HEADER.pack(V5_START,len(payload),V5_CONTROL_RESPONSE,(sequence & 0xFF) | 0x1200,serial)+payload
+        return frame+bytes((sum(frame[1:]) & 0xFF,V5_END))
+
+    async def handleSolarmanV5(self,reader:asyncio.StreamReader,writer:asyncio.StreamWriter) -> None:
+        """Serve V5 requests on one persistent connection until the client closes it"""
+        try:
+            while True:
+                header=await reader.readexactly(V5_HEADER.size)
+                request=header+await reader.readexactly(int.from_bytes(header[1:3],"little")+2)
+                self.requests+=1
+
+                delay=self._config.latency+self._random.uniform(-self._config.jitter,self._config.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if self._random.random() < self._config.drop_rate:
+                    break
+
+                response=self.solarmanV5Response(request)
+                if response is not None:
+                    writer.write(response)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError,ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def moniterPayload(self) -> bytes:
+        return self._payload([
+            self.logger_serial,
+            "H4.01.51Y4.0.02W1.0.57(GL17-07-261-D)",
+            "Enable",
+            "",
+            "",
+            "",
+            "Enable",
+            "HomeNetwork",
+            f"{self._random.randint(40,100)}",
+            self.ip_address,
+            f"98:D8:63:{self._random.randint(0,255):02X}:00:01",
+            "Connected",
+            "Unconnected"
+        ])
+
+    def _payload(self,fields:list[str]) -> bytes:
+        payload=(";".join(fields)+";\r\n").encode()
+        if self._config.truncate_rate and self._random.random() < self._config.truncate_rate:
+            #Cut short mid field, like a stick that ran out of buffer
+            payload=payload[:self._random.randrange(1,len(payload))]
+        return payload.ljust(self._config.padding,b"\x00")
+
+    async def handle(self,request:web.Request) -> web.StreamResponse:
+        self.requests+=1
+
+        delay=self._config.latency+self._random.uniform(-self._config.jitter,self._config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._random.random() < self._config.drop_rate:
+            #Drop the connection without answering, like a stick losing Wi-Fi mid request
+            request.transport.close()
+            raise ConnectionResetError("Dropped by fake stick")
+
+        if request.headers.get("Authorization") != self._authorization:
+            return web.Response(status=401,headers={"WWW-Authenticate":'Basic realm="USER LOGIN"'})
+
+        if request.path == "/inverter.cgi":
+            return web.Response(body=self.inverterPayload(),content_type="text/plain")
+
+        if request.path == "/moniter.cgi":
+            return web.Response(body=self.moniterPayload(),content_type="text/plain")
+
+        return web.Response(status=404)
+
+async def start_fake_sticks(count:int,host:str,base_port:int,config:FakeStickConfig) -> tuple[list[web.AppRunner],list[FakeSolisStick],list[str]]:
+    """Start count fake sticks on consecutive ports, returning their runners, sticks and urls"""
+    #Dropped requests are intentional, do not log a traceback for each of them
+    logging.getLogger("aiohttp.server").setLevel(logging.CRITICAL)
+
+    runners=[]
+    sticks=[]
+    urls=[]
+
+    for index in range(count):
+        stick=FakeSolisStick(index,config)
+        app=web.Application()
+        app.router.add_get("/{name}",stick.handle)
+
+        runner=web.AppRunner(app,access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner,host,base_port+index).start()
+
+        runners.append(runner)
+        sticks.append(stick)
+        urls.append(f"http://{host}:{base_port+index}/")
+
+    return runners,sticks,urls
+
+async def start_solarman_v5_servers(sticks:list[FakeSolisStick],host:str,base_port:int) -> list[asyncio.Server]:
+    """Serve Solarman V5 for each stick on consecutive ports"""
+    return [await asyncio.start_server(stick.handleSolarmanV5,host,base_port+index) for index,stick in enumerate(sticks)]
+
+async def serve(count:int,host:str,base_port:int,config:FakeStickConfig,v5_base_port:int=0) -> None:
+    runners,sticks,urls=await start_fake_sticks(count,host,base_port,config)
+    print(f"Serving {count} fake sticks on {urls[0]} .. {urls[-1]}",flush=True)
+
+    servers=[]
+    if v5_base_port:
+        servers=await start_solarman_v5_servers(sticks,host,v5_base_port)
+        print(f"Serving Solarman V5 on {host}:{v5_base_port} .. {v5_base_port+count-1}, logger serials {sticks[0].logger_serial} .. {sticks[-1].logger_serial}",flush=True)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for server in servers:
+            server.close()
+        for runner in runners:
+            await runner.cleanup()
+
+def add_stick_arguments(parser:argparse.ArgumentParser) -> None:
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--base-port",type=int,default=18000)
+    parser.add_argument("--latency",type=float,default=0.0,help="Response latency in seconds")
+    parser.add_argument("--jitter",type=float,default=0.0,help="Random +/- latency jitter in seconds")
+    parser.add_argument("--drop-rate",type=float,default=0.0,help="Fraction of requests dropped without answer")
+    parser.add_argument("--truncate-rate",type=float,default=0.0,help="Fraction of CGI payloads cut short")
+    parser.add_argument("--username",default="admin")
+    parser.add_argument("--password",default="admin")
+
+def stick_config(args:argparse.Namespace) -> FakeStickConfig:
+    return FakeStickConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        truncate_rate=args.truncate_rate,
+        username=args.username,
+        password=args.password
+    )
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Serve fake Solis Wifi Data Logger sticks")
+    parser.add_argument("--count",type=int,default=1)
+    parser.add_argument("--v5-base-port",type=int,default=0,help="Also serve Solarman V5 from this port, 0 disables it")
+    add_stick_arguments(parser)
+    args=parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.count,args.host,args.base_port,stick_config(args),args.v5_base_port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Fleet polling benchmark for SolisWifiApi.
+
+Polls N fake sticks (see fake_solis_stick.py) the way the coordinators do:
+one long lived SolisWifiApi per stick on the connection pool shared through
+SolisWifiApiScheduler, with staggered poll slots. Reports p50/p99 poll
+latency, CPU per poll, memory allocated per poll and the error rate.
+
+The fake sticks run in a child process so their CPU time is not counted.
+Needs the integration's requirements (aiohttp, homeassistant) installed,
+no network access or hardware is used.
+
+    python -m benchmarks.fleet_poll --sticks 50 --rounds 20 --interval 1 --latency 0.05 --jitter 0.02 --drop-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+import tracemalloc
+
+from custom_components.solis_wifi_data_logger.const import MAX_CONCURRENT_POLLS,POLL_STAGGER_WINDOW,DEFAULT_MAX_CONCURRENT_REQUESTS
+from custom_components.solis_wifi_data_logger.scheduler import SolisWifiApiScheduler
+from custom_components.solis_wifi_data_logger.solis_wifi_api import SolisWifiApi
+
+from .fake_solis_stick import add_stick_arguments,serve,stick_config
+
+def _serve_sticks(args:argparse.Namespace) -> None:
+    asyncio.run(serve(args.sticks,args.host,args.base_port,stick_config(args)))
+
+def percentile(samples:list[float],fraction:float) -> float:
+    ordered=sorted(samples)
+    return ordered[min(len(ordered)-1,int(round(fraction*(len(ordered)-1))))]
+
+async def _poll_stick(api:SolisWifiApi,scheduler:SolisWifiApiScheduler,rounds:int,interval:float,latencies:list[float],errors:list[str]) -> None:
+    for _ in range(rounds):
+        started=time.monotonic()
+        try:
+            async with scheduler.pollSlot():
+                start=time.perf_counter()
+                async with asyncio.timeout(20):
+                    await api.getSystemData()
+                latencies.append(time.perf_counter()-start)
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+        await asyncio.sleep(max(0,interval-(time.monotonic()-started)))
+
+async def _measure_allocations(url:str,args:argparse.Namespace,polls:int) -> float:
+    """Peak bytes allocated per sequential poll, traced with tracemalloc"""
+    api=SolisWifiApi(url,args.username,args.password)
+    await api.getSystemData()
+
+    peaks=[]
+    tracemalloc.start()
+    try:
+        for _ in range(polls):
+            tracemalloc.reset_peak()
+            baseline=tracemalloc.get_traced_memory()[0]
+            try:
+                await api.getSystemData()
+            except Exception:
+                continue
+            peaks.append(tracemalloc.get_traced_memory()[1]-baseline)
+    finally:
+        tracemalloc.stop()
+        await api.close()
+
+    return statistics.mean(peaks) if peaks else 0.0
+
+async def run(args:argparse.Namespace,urls:list[str]) -> dict:
+    scheduler=SolisWifiApiScheduler(args.max_concurrent_polls,args.poll_stagger_window)
+    apis=[
+        SolisWifiApi(url,args.username,args.password,session=scheduler.register(url),maxConcurrentRequests=args.max_concurrent_requests)
+        for url in urls
+    ]
+    latencies:list[float]=[]
+    errors:list[str]=[]
+
+    wall_start=time.perf_counter()
+    cpu_start=time.process_time()
+
+    await asyncio.gather(*(_poll_stick(api,scheduler,args.rounds,args.interval,latencies,errors) for api in apis))
+
+    cpu=time.process_time()-cpu_start
+    wall=time.perf_counter()-wall_start
+
+    for url,api in zip(urls,apis):
+        await api.close()
+        await scheduler.unregister(url)
+
+    polls=len(latencies)+len(errors)
+
+    return {
+        "sticks":len(urls),
+        "polls":polls,
+        "wall_s":round(wall,3),
+        "polls_per_s":round(polls/wall,1),
+        "p50_ms":round(percentile(latencies,0.50)*1000,2) if latencies else None,
+        "p99_ms":round(percentile(latencies,0.99)*1000,2) if latencies else None,
+        "cpu_per_poll_ms":round(cpu/polls*1000,3) if polls else None,
+        "alloc_per_poll_kib":round(await _measure_allocations(urls[0],args,args.allocation_polls)/1024,1),
+        "error_rate":round(len(errors)/polls,4) if polls else None,
+        "errors":{name:errors.count(name) for name in sorted(set(errors))}
+    }
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Benchmark polling a fleet of fake Solis sticks")
+    parser.add_argument("--sticks",type=int,default=10)
+    parser.add_argument("--rounds",type=int,default=20,help="Polls per stick")
+    parser.add_argument("--interval",type=float,default=1.0,help="Seconds between polls of one stick")
+    parser.add_argument("--max-concurrent-requests",type=int,default=DEFAULT_MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--max-concurrent-polls",type=int,default=MAX_CONCURRENT_POLLS)
+    parser.add_argument("--poll-stagger-window",type=float,default=POLL_STAGGER_WINDOW)
+    parser.add_argument("--allocation-polls",type=int,default=50)
+    parser.add_argument("--external",action="store_true",help="Poll sticks already served by fake_solis_stick")
+    parser.add_argument("--json",action="store_true",help="Print the results as JSON")
+    add_stick_arguments(parser)
+    args=parser.parse_args()
+
+    urls=[f"http://{args.host}:{args.base_port+index}/" for index in range(args.sticks)]
+
+    server=None
+    if not args.external:
+        server=multiprocessing.Process(target=_serve_sticks,args=(args,),daemon=True)
+        server.start()
+        time.sleep(1+args.sticks*0.01)
+
+    try:
+        results=asyncio.run(run(args,urls))
+    finally:
+        if server is not None:
+            server.terminate()
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key,value in results.items():
+            print(f"{key:>20}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Local stand-in for an InfluxDB/Telegraf listener.
+
+Accepts line protocol over UDP and over HTTP POST (any path, e.g. /write?db=solar),
+counts lines, validates that every line has a measurement, fields and a
+timestamp, and reports the rate every --report seconds.
+
+    python -m benchmarks.metrics_listener --udp-port 8089 --http-port 8086 --print
+
+Point the integration's export option at 127.0.0.1:8089 (influx_udp) or
+http://127.0.0.1:8086/write?db=solar (influx_http).
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+class LineCounter:
+
+    def __init__(self,echo:bool) -> None:
+        self.echo=echo
+        self.lines=0
+        self.invalid=0
+        self.batches=0
+
+    def add(self,payload:bytes) -> None:
+        self.batches+=1
+        for line in payload.decode(errors="replace").splitlines():
+            if not line:
+                continue
+            self.lines+=1
+            #measurement[,tags] fields timestamp, escaped spaces aside
+            if len(line.replace("\\ ","").split(" ")) != 3:
+                self.invalid+=1
+            if self.echo:
+                print(line,flush=True)
+
+class UdpListener(asyncio.DatagramProtocol):
+
+    def __init__(self,counter:LineCounter) -> None:
+        self._counter=counter
+
+    def datagram_received(self,data:bytes,addr) -> None:
+        self._counter.add(data)
+
+async def listen(host:str,udpPort:int,httpPort:int,report:float,echo:bool) -> None:
+    counter=LineCounter(echo)
+    loop=asyncio.get_running_loop()
+    transport,_=await loop.create_datagram_endpoint(lambda: UdpListener(counter),local_addr=(host,udpPort))
+
+    async def write(request:web.Request) -> web.Response:
+        counter.add(await request.read())
+        return web.Response(status=204)
+
+    app=web.Application()
+    app.router.add_post("/{tail:.*}",write)
+    runner=web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner,host,httpPort).start()
+    print(f"Listening for line protocol on udp://{host}:{udpPort} and http://{host}:{httpPort}/",flush=True)
+
+    try:
+        lines=0
+        started=time.monotonic()
+        while True:
+            await asyncio.sleep(report)
+            now=time.monotonic()
+            print(f"lines={counter.lines} batches={counter.batches} invalid={counter.invalid} rate={(counter.lines-lines)/(now-started):.1f}/s",flush=True)
+            lines,started=counter.lines,now
+    finally:
+        transport.close()
+        await runner.cleanup()
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Count InfluxDB line protocol received over UDP and HTTP")
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--udp-port",type=int,default=8089)
+    parser.add_argument("--http-port",type=int,default=8086)
+    parser.add_argument("--report",type=float,default=10.0,help="Seconds between rate reports")
+    parser.add_argument("--print",dest="echo",action="store_true",help="Print every line received")
+    args=parser.parse_args()
+
+    try:
+        asyncio.run(listen(args.host,args.udp_port,args.http_port,args.report,args.echo))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmark of the CGI payload parser.
+
+Compares the schema driven bytes parser in cgi_schema.py with the previous
+text based path (decode the whole body, strip NULs and suffix, split, then
+convert every field by hand) on payloads shaped like the real stick's.
+
+    python -m benchmarks.parser_bench --number 100000
+
+The old path read the body with response.text(), which runs charset
+detection when the stick sends no charset. The "legacy + detect" case adds
+that cost using charset_normalizer, the detector aiohttp falls back to.
+"""
+import argparse
+import timeit
+
+import charset_normalizer
+
+from custom_components.solis_wifi_data_logger.cgi_schema import INVERTER_SCHEMA,MONITER_SCHEMA
+
+from .fake_solis_stick import FakeSolisStick,FakeStickConfig
+
+def legacy_parse_response_text(responseText:str) -> list[str]:
+    cleanedup=responseText.replace("\x00","").removesuffix(";\r\n")
+    return cleanedup.split(";")
+
+def legacy_text(body:bytes) -> str:
+    return body.decode(charset_normalizer.detect(body)["encoding"] or "utf-8")
+
+def legacy_inverter(body:bytes,decode=bytes.decode) -> dict:
+    raw=legacy_parse_response_text(decode(body))
+    if len(raw) != 8:
+        raise ValueError()
+    return {
+        "serial_number":raw[0],
+        "firmware_version":raw[1],
+        "model":raw[2],
+        "temperature":float(raw[3]),
+        "current_power":float(raw[4]),
+        "daily_power_yield":float(raw[5]),
+        "alerts":True if raw[7] == "YES" else False
+    }
+
+def legacy_moniter(body:bytes,decode=bytes.decode) -> dict:
+    raw=legacy_parse_response_text(decode(body))
+    if len(raw) != 13:
+        raise ValueError()
+    return {
+        "serial_number":raw[0],
+        "firmware_version":raw[1],
+        "wireless_ap_mode":True if raw[2] == "Enable" else False,
+        "wireless_sta_mode":True if raw[6] == "Enable" else False,
+        "router_ssid":raw[7],
+        "signal_quality":int(raw[8]),
+        "ip_address":raw[9],
+        "mac_address":raw[10],
+        "remote_server_a":True if raw[11] == "Connected" else False,
+        "remote_server_b":True if raw[12] == "Connected" else False
+    }
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Benchmark the CGI payload parser")
+    parser.add_argument("--number",type=int,default=100000)
+    parser.add_argument("--padding",type=int,default=512,help="Size of the NUL padded payload")
+    args=parser.parse_args()
+
+    stick=FakeSolisStick(0,FakeStickConfig(padding=args.padding))
+    inverter=stick.inverterPayload()
+    moniter=stick.moniterPayload()
+
+    assert legacy_inverter(inverter) == INVERTER_SCHEMA.parse(inverter)
+    assert legacy_moniter(moniter) == MONITER_SCHEMA.parse(moniter)
+
+    cases=[
+        ("inverter legacy + detect",lambda: legacy_inverter(inverter,legacy_text),args.number//100),
+        ("inverter legacy",lambda: legacy_inverter(inverter),args.number),
+        ("inverter schema",lambda: INVERTER_SCHEMA.parse(inverter),args.number),
+        ("moniter legacy + detect",lambda: legacy_moniter(moniter,legacy_text),args.number//100),
+        ("moniter legacy",lambda: legacy_moniter(moniter),args.number),
+        ("moniter schema",lambda: MONITER_SCHEMA.parse(moniter),args.number),
+    ]
+
+    for name,case,number in cases:
+        seconds=min(timeit.repeat(case,number=max(1,number),repeat=5))
+        print(f"{name:>24}: {seconds/max(1,number)*1e6:.2f} us/parse")
+
+if __name__ == "__main__":
+    main()
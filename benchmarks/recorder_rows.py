@@ -0,0 +1,196 @@
+"""Database rows written per day by the logger's sensors, per recorder profile.
+
+Replays a simulated day of polls through the integration's change detector,
+offline state engine and entity descriptions, and counts what the recorder
+would write:
+
+  states            one row per state written by an entity
+  state_attributes  one row per distinct set of recorded attributes of an entity,
+                    the recorder shares identical attribute rows between states
+
+    python -m benchmarks.recorder_rows --inverter-interval 5 --logger-interval 300
+
+"before" is the standard profile with only the static attributes excluded from
+recording, as shipped before the recorder profiles. The history, energy and
+poll metric sensors write the same rows in every profile and are left out.
+
+The statistics rows compare the recorder compiling current_power and
+daily_power_yield, a short term row every 5 minutes and an hourly row each,
+with the integration writing them as external statistics, one row per
+statistic for each hour the stick was online. The compiled energy sum is
+checked against the day's yield.
+"""
+import argparse
+import dataclasses
+import json
+import math
+import random
+from collections import Counter
+from datetime import datetime,timedelta
+
+from custom_components.solis_wifi_data_logger.solis_wifi_api import SystemData,InverterData,WifiDataLoggerData
+from custom_components.solis_wifi_data_logger.change_detection import SystemDataChangeDetector
+from custom_components.solis_wifi_data_logger.offline import OfflineStateEngine
+from custom_components.solis_wifi_data_logger.recorder import exclude_attributes
+from custom_components.solis_wifi_data_logger.sensor import SENSOR_DESCRIPTIONS,VOLATILE_SENSOR_DESCRIPTIONS
+from custom_components.solis_wifi_data_logger.binary_sensor import BINARY_SENSOR_DESCRIPTIONS
+from custom_components.solis_wifi_data_logger.statistics import HourlyStatisticsCompiler
+from custom_components.solis_wifi_data_logger.const import (
+    DATA_SOURCE_INVERTER,
+    DATA_SOURCE_WIFI_LOGGER,
+    ATTR_LAST_SEEN,
+    RECORDER_PROFILE_STANDARD,
+    RECORDER_PROFILE_MINIMAL,
+    RECORDER_MINIMAL_TEMPERATURE_DEADBAND,
+    RECORDER_MINIMAL_SIGNAL_QUALITY_DEADBAND,
+    VOLATILE_ATTRIBUTES,
+    STATISTICS_FIELDS
+)
+
+def simulateDay(args:argparse.Namespace):
+    """Yields (timestamp, refreshed data sources, SystemData or None while the stick is unreachable)"""
+    rng=random.Random(args.seed)
+    midnight=datetime(2024,6,21)
+    dailyYield=0.0
+    signalQuality=70
+    loggerPolledAt=None
+    t=0.0
+
+    while t < 86400:
+        hour=t/3600
+        if not args.wake <= hour < args.sleep:
+            #The stick is powered by the inverter, adaptive polling backs off while it is unreachable
+            loggerPolledAt=None
+            yield t,None
+            t+=args.offline_interval
+            continue
+
+        sun=math.sin(math.pi*(hour-6)/12) if 6 < hour < 18 else 0.0
+        power=round(max(0.0,args.peak_power*sun*rng.uniform(0.85,1.0)))
+        temperature=round(20+power/150+rng.uniform(-0.3,0.3),1)
+        dailyYield+=power*args.inverter_interval/3600000
+
+        sources={DATA_SOURCE_INVERTER}
+        if loggerPolledAt is None or t-loggerPolledAt >= args.logger_interval:
+            loggerPolledAt=t
+            signalQuality=min(100,max(0,signalQuality+rng.randint(-4,4)))
+            sources.add(DATA_SOURCE_WIFI_LOGGER)
+
+        yield t,sources,SystemData(
+            InverterData("1801A3220A280123","0123","1031",temperature,float(power),math.floor(dailyYield*10)/10,False),
+            WifiDataLoggerData(True,midnight+timedelta(seconds=t),"1920102271","H4.01.51Y4.0.02W1.0.57(2018-03-041-D)",True,True,"solar-net",signalQuality,"192.168.1.50","98:D8:63:00:11:22",True,False)
+        )
+
+        t+=args.inverter_interval
+
+def countRows(args:argparse.Namespace,profile:str,excluded:set[str]) -> Counter:
+    temperatureDeadband=args.temperature_deadband
+    signalQualityDeadband=args.signal_quality_deadband
+    if profile == RECORDER_PROFILE_MINIMAL:
+        temperatureDeadband=max(temperatureDeadband,RECORDER_MINIMAL_TEMPERATURE_DEADBAND)
+        signalQualityDeadband=max(signalQualityDeadband,RECORDER_MINIMAL_SIGNAL_QUALITY_DEADBAND)
+
+    detector=SystemDataChangeDetector({
+        (DATA_SOURCE_INVERTER,"temperature"):temperatureDeadband,
+        (DATA_SOURCE_WIFI_LOGGER,"signal_quality"):signalQualityDeadband
+    })
+    offlineState=OfflineStateEngine()
+
+    #(name, data source, watched fields, attribute names) of every enabled entity, as the entity classes set them up
+    entities=[(description.key,description.data_source,(description.key,),()) for description in SENSOR_DESCRIPTIONS]
+    if profile == RECORDER_PROFILE_MINIMAL:
+        entities+=[(description.key,description.data_source,(description.key,),()) for description in VOLATILE_SENSOR_DESCRIPTIONS if description.entity_registry_enabled_default]
+    for description in BINARY_SENSOR_DESCRIPTIONS:
+        attributeNames=description.attribute_names
+        if profile == RECORDER_PROFILE_MINIMAL:
+            attributeNames=tuple(name for name in attributeNames if name not in VOLATILE_ATTRIBUTES)
+        entities.append((description.key,description.data_source,(description.key,)+attributeNames,attributeNames))
+
+    rows=Counter()
+    attributeRows=set()
+    lastKnown=None
+
+    for sample in simulateDay(args):
+        if sample[1] is None:
+            if offlineState.inOutage:
+                continue
+            systemData=offlineState.offlineData(lastKnown)
+            sources={DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER}
+        else:
+            _,sources,systemData=sample
+            offlineState.recovered()
+            if lastKnown is not None and DATA_SOURCE_WIFI_LOGGER not in sources:
+                #Inverter only polls keep the logger data, only last_seen moves
+                systemData=dataclasses.replace(systemData,wifi_logger=dataclasses.replace(lastKnown.wifi_logger,last_seen=systemData.wifi_logger.last_seen))
+            lastKnown=systemData
+
+        changed=detector.detect(systemData,sources)
+
+        for name,dataSource,watched,attributeNames in entities:
+            if not any((dataSource,field) in changed for field in watched):
+                continue
+
+            rows[name]+=1
+            data=getattr(systemData,dataSource)
+            recorded={attribute:str(getattr(data,attribute)) for attribute in attributeNames if attribute not in excluded}
+            key=(name,json.dumps(recorded,sort_keys=True))
+            if key not in attributeRows:
+                attributeRows.add(key)
+                rows["state_attributes"]+=1
+
+    return rows
+
+def countStatisticsRows(args:argparse.Namespace) -> tuple[int,int,float,float]:
+    """Rows compiled by the recorder and written as external statistics, the compiled energy sum and the day's yield"""
+    compiled=len(STATISTICS_FIELDS)*(86400//300+24)
+
+    compiler=HourlyStatisticsCompiler()
+    offlineState=OfflineStateEngine()
+    lastKnown=None
+    for sample in simulateDay(args):
+        if sample[1] is None:
+            systemData=offlineState.offlineData(lastKnown)
+        else:
+            offlineState.recovered()
+            systemData=lastKnown=sample[2]
+        compiler.update(systemData,sample[0],1)
+
+    hours=compiler.drain(includeCurrent=True)
+    return compiled,2*len(hours),hours[-1].sum,lastKnown.inverter.daily_power_yield
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Count the recorder rows written per day by each recorder profile")
+    parser.add_argument("--inverter-interval",type=float,default=5.0,help="Seconds between inverter.cgi polls")
+    parser.add_argument("--logger-interval",type=float,default=300.0,help="Seconds between moniter.cgi polls")
+    parser.add_argument("--offline-interval",type=float,default=300.0,help="Seconds between polls while the stick is unreachable")
+    parser.add_argument("--temperature-deadband",type=float,default=0.0)
+    parser.add_argument("--signal-quality-deadband",type=int,default=0)
+    parser.add_argument("--peak-power",type=float,default=3000.0,help="Watts at noon")
+    parser.add_argument("--wake",type=float,default=5.5,help="Hour the stick comes online")
+    parser.add_argument("--sleep",type=float,default=20.5,help="Hour the stick goes offline")
+    parser.add_argument("--seed",type=int,default=1)
+    args=parser.parse_args()
+
+    static=exclude_attributes(None)
+    results={
+        "before":countRows(args,RECORDER_PROFILE_STANDARD,static-{ATTR_LAST_SEEN}),
+        RECORDER_PROFILE_STANDARD:countRows(args,RECORDER_PROFILE_STANDARD,static),
+        RECORDER_PROFILE_MINIMAL:countRows(args,RECORDER_PROFILE_MINIMAL,static)
+    }
+
+    names=list(dict.fromkeys(name for rows in results.values() for name in rows if name != "state_attributes"))
+    print(f"{'rows per day':<24}"+"".join(f"{profile:>10}" for profile in results))
+    for name in names:
+        print(f"{name:<24}"+"".join(f"{rows[name]:>10}" for rows in results.values()))
+    print(f"{'states total':<24}"+"".join(f"{sum(rows.values())-rows['state_attributes']:>10}" for rows in results.values()))
+    print(f"{'state_attributes':<24}"+"".join(f"{rows['state_attributes']:>10}" for rows in results.values()))
+    print(f"{'rows total':<24}"+"".join(f"{sum(rows.values()):>10}" for rows in results.values()))
+
+    compiled,external,energySum,dailyYield=countStatisticsRows(args)
+    print()
+    print(f"{'statistics rows per day':<24}{'compiled':>10}{'external':>10}")
+    print(f"{'statistics':<24}{compiled:>10}{external:>10}")
+    print(f"Energy sum {energySum:.1f} kWh, daily_power_yield {dailyYield:.1f} kWh")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Replays captured CGI responses through SolisWifiApi's read, parse and convert path.
+
+Takes capture files written by the integration's capture option or by the
+scraper's --capture, or records a fresh one from a fake stick with --record,
+and feeds every response back through ReplaySolisWifiApi in capture order. It
+reports responses per second and how many bodies failed to parse, so captures
+from many firmware versions can serve as a regression and throughput corpus.
+
+    python -m benchmarks.replay_bench config/solis_wifi_data_logger/*.swdc
+    python -m benchmarks.replay_bench --record 2000 --truncate-rate 0.01
+    python -m benchmarks.replay_bench --dump config/solis_wifi_data_logger/1920102271.swdc
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from custom_components.solis_wifi_data_logger.solis_wifi_api import SolisWifiApi,SolisWifiApiParseException
+from custom_components.solis_wifi_data_logger.capture import CaptureWriter,ReplaySolisWifiApi,readCapture
+
+from .fake_solis_stick import start_fake_sticks,add_stick_arguments,stick_config
+
+async def record(path:str,polls:int,args:argparse.Namespace) -> None:
+    """Poll one fake stick with capture on, polls inverter.cgi and moniter.cgi requests"""
+    config=stick_config(args)
+    runners,_,urls=await start_fake_sticks(1,args.host,args.base_port,config)
+    capture=CaptureWriter(path,maxBytes=1 << 30)
+
+    try:
+        api=SolisWifiApi(urls[0],config.username,config.password,capture=capture)
+        for index in range(polls):
+            try:
+                if index % 2:
+                    await api.getWifiDataLoggerData()
+                else:
+                    await api.getInverterData()
+            except SolisWifiApiParseException:
+                pass
+        await api.close()
+        await capture.close()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+async def replay(paths:list[str],realtime:bool) -> None:
+    responses=[response for path in paths for response in readCapture(path)]
+    api=ReplaySolisWifiApi(responses,realtime=realtime)
+    getters={"inverter":api.getInverterData,"moniter":api.getWifiDataLoggerData}
+
+    results=Counter()
+    start=time.perf_counter()
+    for response in responses:
+        try:
+            await getters[response.dataSource]()
+            results[f"{response.dataSource} ok"]+=1
+        except SolisWifiApiParseException:
+            results[f"{response.dataSource} parse error"]+=1
+    elapsed=time.perf_counter()-start
+    await api.close()
+
+    print(f"Replayed {len(responses)} responses in {elapsed:.3f}s, {len(responses)/elapsed:,.0f} responses/s")
+    for result,count in sorted(results.items()):
+        print(f"  {result:<24}{count:>8}")
+
+def dump(paths:list[str]) -> None:
+    #One line per response, the body as escaped bytes without its NUL padding
+    for path in paths:
+        for response in readCapture(path):
+            print(f"{datetime.fromtimestamp(response.timestamp).isoformat()} {response.dataSource} {response.latency*1000:.1f}ms {len(response.body)}B {response.body.rstrip(bytes(1))!r}")
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Replay captured logger responses through the parser")
+    parser.add_argument("captures",nargs="*",help="Capture files, rotated backups are read too")
+    parser.add_argument("--record",type=int,default=0,help="First capture this many responses from a fake stick")
+    parser.add_argument("--realtime",action="store_true",help="Wait the recorded latency before each response")
+    parser.add_argument("--dump",action="store_true",help="Print the captured responses instead of replaying them")
+    add_stick_arguments(parser)
+    args=parser.parse_args()
+
+    paths=list(args.captures)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.record:
+            path=os.path.join(directory,"fake.swdc")
+            asyncio.run(record(path,args.record,args))
+            print(f"Captured {args.record} responses, {os.path.getsize(path)} bytes")
+            paths.append(path)
+
+        if not paths:
+            parser.error("no capture files given")
+
+        if args.dump:
+            dump(paths)
+        else:
+            asyncio.run(replay(paths,args.realtime))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Inverter reads over inverter.cgi against reads over Solarman V5.
+
+Starts one fake stick serving both transports and reads the inverter data
+--polls times through SolisWifiApi (HTTP, BasicAuth, keep-alive pool) and
+through SolarmanV5Api (one register block on a persistent TCP connection),
+reporting the latency percentiles and the bytes received per read.
+
+    python -m benchmarks.transport_bench --polls 500 --latency 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from custom_components.solis_wifi_data_logger.solis_wifi_api import SolisWifiApi
+from custom_components.solis_wifi_data_logger.solarman_v5 import SolarmanV5Api,SOLARMAN_V5_ENDPOINT
+from custom_components.solis_wifi_data_logger.metrics import PollMetrics
+
+from .fake_solis_stick import start_fake_sticks,start_solarman_v5_servers,add_stick_arguments,stick_config
+
+async def measure(api:SolisWifiApi,metrics:PollMetrics,endpoint:str,polls:int) -> dict:
+    latencies=[]
+    for _ in range(polls):
+        start=time.perf_counter()
+        await api.getInverterData()
+        latencies.append(time.perf_counter()-start)
+
+    await api.close()
+    latencies.sort()
+    return {
+        "p50_ms":statistics.median(latencies)*1000,
+        "p99_ms":latencies[int(len(latencies)*0.99)-1]*1000,
+        "bytes_per_read":metrics.endpoints[endpoint].bytesReceived/polls
+    }
+
+async def run(args:argparse.Namespace) -> None:
+    config=stick_config(args)
+    runners,sticks,urls=await start_fake_sticks(1,args.host,args.base_port,config)
+    servers=await start_solarman_v5_servers(sticks,args.host,args.v5_base_port)
+
+    try:
+        httpMetrics=PollMetrics()
+        http=await measure(SolisWifiApi(urls[0],config.username,config.password,metrics=httpMetrics),httpMetrics,"inverter",args.polls)
+
+        v5Metrics=PollMetrics()
+        v5Api=SolarmanV5Api(urls[0],config.username,config.password,int(sticks[0].logger_serial),port=args.v5_base_port,metrics=v5Metrics)
+        v5=await measure(v5Api,v5Metrics,SOLARMAN_V5_ENDPOINT,args.polls)
+    finally:
+        for server in servers:
+            server.close()
+        for runner in runners:
+            await runner.cleanup()
+
+    print(f"{'transport':<12}{'p50 ms':>10}{'p99 ms':>10}{'bytes/read':>12}")
+    for name,result in (("http",http),("solarman_v5",v5)):
+        print(f"{name:<12}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['bytes_per_read']:>12.0f}")
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description="Compare inverter reads over inverter.cgi and Solarman V5")
+    parser.add_argument("--polls",type=int,default=500)
+    parser.add_argument("--v5-base-port",type=int,default=18899)
+    add_stick_arguments(parser)
+    args=parser.parse_args()
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
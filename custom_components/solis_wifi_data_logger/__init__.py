@@ -3,11 +3,13 @@ import logging
 
 from homeassistant import config_entries, core
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST,CONF_USERNAME,CONF_PASSWORD
 from homeassistant.helpers.typing import HomeAssistantType
 
-from .const import DOMAIN, COORDINATOR
+from .const import DOMAIN, SCHEDULER, PLATFORMS, MAX_CONCURRENT_POLLS, POLL_STAGGER_WINDOW, EXPORT_TARGET_PROMETHEUS, PROMETHEUS_VIEW
 from .data_update_coordinator import SolisWifiApiDataUpdateCoordinator
+from .scheduler import SolisWifiApiScheduler
+from .services import async_setup_services
+from .prometheus import SolisPrometheusView
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,38 +17,66 @@ async def async_setup(hass, config):
     """Set up Heamiser Neo components."""
     hass.data.setdefault(DOMAIN, {})
 
+    async_setup_services(hass)
+
     return True
 
+def _get_scheduler(hass:HomeAssistantType) -> SolisWifiApiScheduler:
+    """Return the scheduler shared by all Solis Wifi Data Loggers."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if SCHEDULER not in domain_data:
+        domain_data[SCHEDULER] = SolisWifiApiScheduler(MAX_CONCURRENT_POLLS,POLL_STAGGER_WINDOW)
+
+    return domain_data[SCHEDULER]
+
 async def async_setup_entry(hass:HomeAssistantType, entry:ConfigEntry):
     """Set up Solis Wifi Data Logger from a config entry."""
 
     # Set the Hub up to use and save
-    hostname = entry.data[CONF_HOST]
-    username=entry.data[CONF_USERNAME]
-    password=entry.data[CONF_PASSWORD]
+    coordinator = SolisWifiApiDataUpdateCoordinator(hass,entry,_get_scheduler(hass))
 
+    entry.async_on_unload(entry.add_update_listener(options_update_listener))
 
-    coordinator = SolisWifiApiDataUpdateCoordinator(
-        hass,
-        hostname,
-        username,
-        password
-    )
+    # Build the entities from the last known data and refresh in the background,
+    # only the very first setup has to wait for the logger
+    cached_system_data = await coordinator.async_load_cache()
+    await coordinator.async_load_statistics()
 
-    hass.data[DOMAIN][COORDINATOR] = coordinator
+    if cached_system_data is None:
+        await coordinator.async_config_entry_first_refresh()
+    else:
+        coordinator.async_set_stale_data(cached_system_data)
 
-    await coordinator.async_config_entry_first_refresh()
-    
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "binary_sensor")
-    )
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    coordinator.async_start_exporter(entry)
 
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "sensor")
-    )
+    if coordinator.export_target == EXPORT_TARGET_PROMETHEUS and not hass.data[DOMAIN].get(PROMETHEUS_VIEW):
+        # Views cannot be removed, it only lists the loggers exporting to Prometheus
+        hass.http.register_view(SolisPrometheusView())
+        hass.data[DOMAIN][PROMETHEUS_VIEW] = True
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if cached_system_data is not None:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
 
     return True
 
+async def async_unload_entry(hass:HomeAssistantType, entry:ConfigEntry):
+    """Unload a config entry and close its connection pool."""
+
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    if unload_ok:
+        coordinator:SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+
+    return unload_ok
+
 async def options_update_listener(hass: core.HomeAssistant, config_entry: config_entries.ConfigEntry):
     """Handle options update."""
     await hass.config_entries.async_reload(config_entry.entry_id)
@@ -1,119 +1,111 @@
 import logging
+from dataclasses import dataclass
 from .solis_wifi_api import SystemData
 
-from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
+from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorEntityDescription, BinarySensorDeviceClass
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity
 )
-from homeassistant.helpers.entity import EntityCategory
 from homeassistant.core import callback
 from .utilities import Utilities
 from .data_update_coordinator import SolisWifiApiDataUpdateCoordinator
 from homeassistant.helpers.entity import EntityCategory
 
-from .const import DOMAIN,COORDINATOR
+from .const import DOMAIN,DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER,RECORDER_PROFILE_MINIMAL,VOLATILE_ATTRIBUTES
 
 _LOGGER = logging.getLogger(__name__)
 
+@dataclass
+class SolisBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a binary sensor exposing one field of a SystemData data source"""
+    data_source:str=DATA_SOURCE_INVERTER
+    attribute_names:tuple[str,...]=()
+
+def _description(dataSource:str,key:str,**kwargs) -> SolisBinarySensorEntityDescription:
+    return SolisBinarySensorEntityDescription(
+        key=key,
+        data_source=dataSource,
+        name=Utilities.FormatSensorName(dataSource,key),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        **kwargs
+    )
+
+#Built once at import, one entry per exposed field
+BINARY_SENSOR_DESCRIPTIONS:tuple[SolisBinarySensorEntityDescription,...]=(
+    _description(DATA_SOURCE_INVERTER,"alerts",device_class=BinarySensorDeviceClass.PROBLEM,icon="mdi:alert",attribute_names=("serial_number","firmware_version","model")),
+    _description(DATA_SOURCE_WIFI_LOGGER,"online_status",device_class=BinarySensorDeviceClass.CONNECTIVITY,icon="mdi:wifi-check",attribute_names=("last_seen","serial_number","firmware_version")),
+    _description(DATA_SOURCE_WIFI_LOGGER,"wireless_ap_mode",icon="mdi:access-point"),
+    _description(DATA_SOURCE_WIFI_LOGGER,"wireless_sta_mode",icon="mdi:wifi-settings",attribute_names=("router_ssid","ip_address","mac_address")),
+    _description(DATA_SOURCE_WIFI_LOGGER,"remote_server_a",device_class=BinarySensorDeviceClass.CONNECTIVITY,icon="mdi:connection"),
+    _description(DATA_SOURCE_WIFI_LOGGER,"remote_server_b",device_class=BinarySensorDeviceClass.CONNECTIVITY,icon="mdi:connection"),
+)
+
 async def async_setup_entry(hass, entry, async_add_entities):
 
-    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][COORDINATOR]
+    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     systemdata:SystemData = coordinator.data
+    deviceInfos = {}
 
     sensors = []
-
-    filteredSystemData = { k:v for (k,v) in systemdata.__dict__.items()}
-    for dataSource, value in filteredSystemData.items():
-        propertyNames=[a for a in dir(value) if not a.startswith('__') and not callable(getattr(value, a))]
-        for propertyName in propertyNames:
-            deviceInfo = Utilities.GenerateDeviceInfo(systemdata,dataSource)
-            sensor=SolisApiBinarySensor.factory(coordinator,deviceInfo,dataSource,propertyName)
-            if(sensor):
-                sensors.append(sensor)
+    for description in BINARY_SENSOR_DESCRIPTIONS:
+        if description.data_source not in deviceInfos:
+            deviceInfos[description.data_source] = Utilities.GenerateDeviceInfo(systemdata,description.data_source)
+        sensors.append(SolisApiBinarySensor(coordinator,description,deviceInfos[description.data_source]))
 
     async_add_entities(sensors)
 
 
 class SolisApiBinarySensor(CoordinatorEntity[SolisWifiApiDataUpdateCoordinator],BinarySensorEntity):
-    
-    @staticmethod
-    def factory(coordinator: SolisWifiApiDataUpdateCoordinator,deviceInfo:DeviceInfo,dataSource:str,propertyName:str):
-
-        mapping = {
-            "inverter" : {
-               "alerts" : [BinarySensorDeviceClass.PROBLEM,EntityCategory.DIAGNOSTIC,"mdi:alert",[
-                    "serial_number","firmware_version","model"
-               ]] 
-            },
-            "wifi_logger" : {
-               "online_status" : [BinarySensorDeviceClass.CONNECTIVITY,EntityCategory.DIAGNOSTIC,"mdi:wifi-check",[
-                    "last_seen","serial_number","firmware_version"
-               ]],
-               "wireless_ap_mode" : [None,EntityCategory.DIAGNOSTIC ,"mdi:access-point",None],
-               "wireless_sta_mode" : [None,EntityCategory.DIAGNOSTIC ,"mdi:wifi-settings",[
-                    "router_ssid","ip_address","mac_address"     
-               ]],
-               "remote_server_a" : [BinarySensorDeviceClass.CONNECTIVITY,EntityCategory.DIAGNOSTIC,"mdi:connection",None,None],
-               "remote_server_b" : [BinarySensorDeviceClass.CONNECTIVITY,EntityCategory.DIAGNOSTIC,"mdi:connection",None,None]
-            }
-        }
-        if mapping.get(dataSource) and mapping[dataSource].get(propertyName):
-           configuration=mapping[dataSource][propertyName]     
-        else:
-            return None
-        
-        return SolisApiBinarySensor(coordinator,deviceInfo,dataSource,propertyName,configuration[0],configuration[1],configuration[2],configuration[3])
-
-
-    def __init__(self,coordinator: SolisWifiApiDataUpdateCoordinator,deviceInfo:DeviceInfo,dataSource:str,propertyName:str,binarySensorDeviceClass:BinarySensorDeviceClass|None,entityCategory:EntityCategory|None,icon:str,attributeNames:list[str]|None):
+
+    entity_description: SolisBinarySensorEntityDescription
+
+    def __init__(self,coordinator: SolisWifiApiDataUpdateCoordinator,description:SolisBinarySensorEntityDescription,deviceInfo:DeviceInfo):
         super().__init__(coordinator)
 
-        self._dataSource=dataSource
-        self._propertyName=propertyName
-        self._attr_icon=icon
-        
-        self._attr_entity_category=entityCategory
-        self._attr_device_class=binarySensorDeviceClass
+        self.entity_description=description
+        self._dataSource=description.data_source
+        self._propertyName=description.key
         self._attr_should_poll=False
 
-        self._attr_name=Utilities.FormatSensorName(dataSource,propertyName)
         self._attr_device_info=deviceInfo
-        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,self._attr_name)
+        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,description.name)
+
+        #The minimal recorder profile publishes the volatile attributes as sensors instead
+        self._attributeNames = description.attribute_names
+        if coordinator.recorder_profile == RECORDER_PROFILE_MINIMAL:
+            self._attributeNames = tuple(name for name in description.attribute_names if name not in VOLATILE_ATTRIBUTES)
+        self._watchedFields = (description.key,) + self._attributeNames
 
-        self._attributeNames = attributeNames
-        
         self._updateValue()
         self._updateAttributes()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self.coordinator.has_changed(self._dataSource,self._watchedFields):
+            return
+
         self._updateValue()
         self._updateAttributes()
 
         self.async_write_ha_state()
 
     def _data(self)->SystemData | None:
-        return getattr(self.coordinator.data,self._dataSource,None) 
+        return getattr(self.coordinator.data,self._dataSource,None)
 
     def _updateAttributes(self):
 
         if self._attributeNames:
-            attributes = {}
-            for attributeName in self._attributeNames:
-                attributes[attributeName] = getattr(self._data(),attributeName)
-            self._attr_extra_state_attributes = attributes
+            data = self._data()
+            self._attr_extra_state_attributes = {attributeName:getattr(data,attributeName) for attributeName in self._attributeNames}
 
     def _updateValue(self):
-        if self._propertyName:
-            self._attr_is_on=getattr(self._data(),self._propertyName)
-        else:
-            self._attr_is_on=self._data()    
-        
+        self._attr_is_on=getattr(self._data(),self._propertyName)
+
     @property
     def available(self) -> bool:
-        return self._data() is not None and getattr(self._data(),self._propertyName,None) is not None
+        return not self.coordinator.is_stale and self._data() is not None and getattr(self._data(),self._propertyName,None) is not None
+
 
-    
\ No newline at end of file
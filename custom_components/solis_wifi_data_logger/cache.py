@@ -0,0 +1,112 @@
+import dataclasses
+import json
+import logging
+import os
+
+from homeassistant.core import HomeAssistant,callback
+from homeassistant.helpers.storage import Store
+
+from .solis_wifi_api import SystemData
+from .const import DOMAIN,CACHE_STORAGE_VERSION,CACHE_SAVE_DELAY,LEGACY_CACHE_FILE
+
+_LOGGER = logging.getLogger(__name__)
+
+#Telemetry that changes every poll, not worth a disk write on its own
+VOLATILE_FIELDS={
+    "inverter":{"temperature","current_power","daily_power_yield"},
+    "wifi_logger":{"last_seen","signal_quality"}
+}
+
+class SystemDataCache:
+    """Last known online SystemData of one logger, kept in memory and persisted to HA's storage directory"""
+
+    def __init__(self,hass:HomeAssistant,serial_number:str) -> None:
+        #Written atomically to .storage/solis_wifi_data_logger.<serial>
+        self._hass=hass
+        self._serial_number=serial_number
+        self._store=Store(hass,CACHE_STORAGE_VERSION,f"{DOMAIN}.{serial_number}",atomic_writes=True)
+        self._loaded=False
+        self._dirty=False
+        self.data:SystemData|None=None
+
+    async def async_load(self) -> SystemData|None:
+        """Load the persisted data, the file is only read once"""
+        if not self._loaded:
+            self._loaded=True
+            stored=await self._store.async_load()
+            legacy=stored is None
+            if legacy:
+                stored=await self._hass.async_add_executor_job(self._load_legacy)
+
+            if stored is not None:
+                try:
+                    self.data=SystemData.from_dict(stored)
+                except (KeyError,TypeError,ValueError) as e:
+                    _LOGGER.warning(f"Ignoring unreadable cache {self._store.key}: {e!r}")
+
+            if legacy and self.data is not None:
+                #Written to the store from now on
+                self._dirty=True
+                self.async_schedule_save()
+
+        return self.data
+
+    def _load_legacy(self) -> dict|None:
+        #Earlier versions wrote the data of their only logger to solis_init_data.json in the working directory,
+        #usually the configuration directory, it is only taken up by the entry of the same logger serial
+        for path in dict.fromkeys((os.path.abspath(LEGACY_CACHE_FILE),self._hass.config.path(LEGACY_CACHE_FILE))):
+            try:
+                with open(path,"rb") as f:
+                    stored=json.loads(f.read())
+            except FileNotFoundError:
+                continue
+            except (OSError,ValueError) as e:
+                _LOGGER.warning(f"Ignoring unreadable legacy cache {path}: {e!r}")
+                continue
+
+            wifi_logger=stored.get("wifi_logger") if isinstance(stored,dict) else None
+            if not isinstance(wifi_logger,dict) or wifi_logger.get("serial_number") != self._serial_number:
+                _LOGGER.debug(f"Legacy cache {path} is not of logger {self._serial_number}")
+                continue
+
+            _LOGGER.info(f"Importing legacy cache {path} into {self._store.key}")
+            return stored
+
+        return None
+
+    @callback
+    def async_update(self,data:SystemData) -> None:
+        """Remember the latest online data, metadata changes are written after a debounce delay"""
+        previous=self.data
+        self.data=data
+        self._dirty=True
+
+        if previous is None or self._metadata_changed(previous,data):
+            self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        if self.data is not None:
+            self._store.async_delay_save(self._data_to_save,CACHE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write any change not persisted yet, e.g. a newer last_seen, on unload"""
+        if self._dirty and self.data is not None:
+            await self._store.async_save(self._data_to_save())
+            self._dirty=False
+
+    def _data_to_save(self) -> dict:
+        self._dirty=False
+        return self.data.to_dict()
+
+    @staticmethod
+    def _metadata_changed(previous:SystemData,data:SystemData) -> bool:
+        for dataSource,volatile in VOLATILE_FIELDS.items():
+            previous_data=getattr(previous,dataSource)
+            current_data=getattr(data,dataSource)
+
+            for field in dataclasses.fields(current_data):
+                if field.name not in volatile and getattr(current_data,field.name) != getattr(previous_data,field.name):
+                    return True
+
+        return False
@@ -0,0 +1,180 @@
+"""Capture of raw CGI responses to a rotating file, and replay of a capture through SolisWifiApi.
+
+Each record holds the wall clock time, request latency, data source and body,
+with the stick's NUL padding stored as a count so captures stay small and
+replay byte for byte. benchmarks/replay_bench.py replays and dumps them.
+"""
+import asyncio
+from collections import deque
+from collections.abc import Iterable,Iterator
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+
+from .solis_wifi_api import SolisWifiApi
+from .const import CAPTURE_MAX_BYTES,CAPTURE_BACKUPS
+
+CAPTURE_MAGIC=b"SWDCAP1\n"
+#Timestamp, latency, data source length, trailing NUL count, body length
+RECORD_HEADER=struct.Struct("<dfBHI")
+
+@dataclass(slots=True,frozen=True)
+class CapturedResponse:
+    timestamp:float
+    latency:float
+    dataSource:str
+    body:bytes
+
+def encodeRecord(response:CapturedResponse) -> bytes:
+    body=response.body.rstrip(b"\x00")
+    padding=min(len(response.body)-len(body),0xFFFF)
+    body=response.body[:len(response.body)-padding]
+    dataSource=response.dataSource.encode()
+    return RECORD_HEADER.pack(response.timestamp,response.latency,len(dataSource),padding,len(body))+dataSource+body
+
+def decodeRecords(data:bytes) -> Iterator[CapturedResponse]:
+    """Records of one capture file, a record cut short by a crash ends the file"""
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError("Not a Solis Wifi Data Logger capture file")
+
+    offset=len(CAPTURE_MAGIC)
+    while offset+RECORD_HEADER.size <= len(data):
+        timestamp,latency,dataSourceLength,padding,bodyLength=RECORD_HEADER.unpack_from(data,offset)
+        offset+=RECORD_HEADER.size
+        if offset+dataSourceLength+bodyLength > len(data):
+            break
+
+        dataSource=data[offset:offset+dataSourceLength].decode()
+        offset+=dataSourceLength
+        body=data[offset:offset+bodyLength]+b"\x00"*padding
+        offset+=bodyLength
+
+        yield CapturedResponse(timestamp,latency,dataSource,body)
+
+def capturePaths(path:str) -> list[str]:
+    """The capture and its rotated backups, oldest first"""
+    backups=[]
+    index=1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index+=1
+
+    return list(reversed(backups))+([path] if os.path.exists(path) else [])
+
+def readCapture(path:str) -> list[CapturedResponse]:
+    """Every record of a capture including its rotated backups, oldest first"""
+    responses=[]
+    for capturePath in capturePaths(path):
+        with open(capturePath,"rb") as f:
+            responses.extend(decodeRecords(f.read()))
+
+    return responses
+
+class CaptureWriter:
+    """Appends responses to a file rotated at maxBytes, writes run in the executor and never block the poll"""
+
+    def __init__(self,path:str,maxBytes:int=CAPTURE_MAX_BYTES,backups:int=CAPTURE_BACKUPS) -> None:
+        self.path=path
+        self._maxBytes=maxBytes
+        self._backups=max(0,backups)
+
+        self._pending:list[bytes]=[]
+        self._lock=threading.Lock()
+        self._draining=False
+        self._flush:asyncio.Future|None=None
+
+        self.records=0
+        self.bytesWritten=0
+
+    def record(self,dataSource:str,latency:float,body:bytes) -> None:
+        """Queue a response, an executor job drains the queue unless one is already running"""
+        with self._lock:
+            self._pending.append(encodeRecord(CapturedResponse(time.time(),latency,dataSource,body)))
+            self.records+=1
+            if self._draining:
+                return
+            self._draining=True
+
+        self._flush=asyncio.get_running_loop().run_in_executor(None,self._drain)
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._draining=False
+                    return
+                chunk=b"".join(self._pending)
+                self._pending.clear()
+
+            self._append(chunk)
+
+    def _append(self,chunk:bytes) -> None:
+        size=os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size and size+len(chunk) > self._maxBytes:
+            self._rotate()
+            size=0
+
+        if not size:
+            os.makedirs(os.path.dirname(self.path) or ".",exist_ok=True)
+            chunk=CAPTURE_MAGIC+chunk
+
+        with open(self.path,"ab") as f:
+            f.write(chunk)
+        self.bytesWritten+=len(chunk)
+
+    def _rotate(self) -> None:
+        if not self._backups:
+            os.remove(self.path)
+            return
+
+        for index in range(self._backups-1,0,-1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}",f"{self.path}.{index+1}")
+        os.replace(self.path,f"{self.path}.1")
+
+    async def close(self) -> None:
+        """Wait for the queued responses to be written"""
+        if self._flush is not None:
+            await self._flush
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "path":self.path,
+            "records":self.records,
+            "bytes_written":self.bytesWritten
+        }
+
+class ReplaySolisWifiApi(SolisWifiApi):
+    """SolisWifiApi answered from captured responses, at the recorded latency or as fast as possible"""
+
+    def __init__(self,responses:Iterable[CapturedResponse],realtime:bool=False,loop:bool=False,**kwargs) -> None:
+        super().__init__("replay://capture","","",**kwargs)
+
+        self._responses:dict[str,deque[CapturedResponse]]={}
+        for response in responses:
+            self._responses.setdefault(response.dataSource,deque()).append(response)
+
+        self._realtime=realtime
+        self._loop=loop
+
+    async def _loadResponseBody(self,dataSource:str) -> bytes:
+        responses=self._responses.get(dataSource)
+        if not responses:
+            raise ReplayExhaustedException(f"No captured {dataSource} responses left")
+
+        response=responses.popleft()
+        if self._loop:
+            responses.append(response)
+
+        if self._realtime:
+            await asyncio.sleep(response.latency)
+
+        return response.body
+
+class ReplayExhaustedException(aiohttp.ClientConnectionError):
+    """When the capture has no response left for a request, handled like an unreachable logger"""
@@ -0,0 +1,72 @@
+from dataclasses import dataclass,field
+from functools import partial
+from typing import Any, Callable
+
+#Converters from a raw payload field, float() and int() accept ASCII bytes directly
+text:Callable[[bytes],str]=partial(bytes.decode,encoding="utf-8",errors="replace")
+number:Callable[[bytes],float]=float
+integer:Callable[[bytes],int]=int
+
+def flag(trueValue:str) -> Callable[[bytes],bool]:
+    """Map the stick's enum text, like YES, Enable or Connected, to a bool"""
+    return trueValue.encode().__eq__
+
+@dataclass(frozen=True)
+class CgiField:
+    name:str
+    index:int
+    convert:Callable[[bytes],Any]
+
+@dataclass(frozen=True)
+class CgiSchema:
+    """Declarative layout of a ';' separated CGI payload served by the logger stick"""
+
+    dataSource:str
+    dataSourceName:str
+    expectedLength:int
+    fields:tuple[CgiField,...]
+    _layout:tuple[tuple[str,int,Callable[[bytes],Any]],...]=field(init=False,repr=False,compare=False)
+
+    def __post_init__(self) -> None:
+        #Flattened once so parsing does no attribute lookups per field
+        object.__setattr__(self,"_layout",tuple((cgiField.name,cgiField.index,cgiField.convert) for cgiField in self.fields))
+
+    def parse(self,body:bytes) -> dict[str,Any]:
+        """Parse the raw response body straight into typed fields, raises ValueError when it does not match"""
+
+        #The stick pads its fixed size buffer with NUL characters
+        cleaned=body.rstrip(b"\x00")
+        if b"\x00" in cleaned:
+            cleaned=cleaned.replace(b"\x00",b"")
+
+        values=cleaned.removesuffix(b";\r\n").split(b";")
+
+        if len(values) != self.expectedLength:
+            raise ValueError(f"Expected {self.expectedLength} fields, got {len(values)}")
+
+        return {name:convert(values[index]) for (name,index,convert) in self._layout}
+
+INVERTER_SCHEMA=CgiSchema("inverter","Inverter",8,(
+    CgiField("serial_number",0,text),
+    CgiField("firmware_version",1,text),
+    CgiField("model",2,text),
+    CgiField("temperature",3,number),
+    CgiField("current_power",4,number),
+    CgiField("daily_power_yield",5,number),
+    #Data in element 6 is 'Total yield' which only show value 'd'??
+    CgiField("alerts",7,flag("YES")),
+))
+
+MONITER_SCHEMA=CgiSchema("moniter","Wifi Data Logger",13,(
+    CgiField("serial_number",0,text),
+    CgiField("firmware_version",1,text),
+    CgiField("wireless_ap_mode",2,flag("Enable")),
+    #Data in elements 3-5 are Null, do not know what they are
+    CgiField("wireless_sta_mode",6,flag("Enable")),
+    CgiField("router_ssid",7,text),
+    CgiField("signal_quality",8,integer),
+    CgiField("ip_address",9,text),
+    CgiField("mac_address",10,text),
+    CgiField("remote_server_a",11,flag("Connected")),
+    CgiField("remote_server_b",12,flag("Connected")),
+))
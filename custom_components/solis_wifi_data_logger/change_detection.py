@@ -0,0 +1,55 @@
+import dataclasses
+
+from .solis_wifi_api import SystemData
+
+class SystemDataChangeDetector:
+    """Diffs each new SystemData against the last published values, field by field"""
+
+    def __init__(self,deadbands:dict[tuple[str,str],float]|None=None) -> None:
+        #Noisy numeric fields only count as changed when they move further than their deadband
+        self._deadbands={key:deadband for (key,deadband) in (deadbands or {}).items() if deadband}
+        self._published:dict[tuple[str,str],object]={}
+        self._fieldNames:dict[type,tuple[str,...]]={}
+
+    def detect(self,systemData:SystemData,dataSources:set[str]) -> set[tuple[str,str]]:
+        """Return the (data source, field) pairs that changed since they were last published"""
+
+        changed=set()
+
+        for dataSource in dataSources:
+            data=getattr(systemData,dataSource)
+
+            for fieldName in self._getFieldNames(data):
+                key=(dataSource,fieldName)
+                value=getattr(data,fieldName)
+
+                if key in self._published and not self._hasChanged(key,self._published[key],value):
+                    continue
+
+                self._published[key]=value
+                changed.add(key)
+
+        return changed
+
+    def reset(self) -> None:
+        self._published.clear()
+
+    def _getFieldNames(self,data) -> tuple[str,...]:
+        fieldNames=self._fieldNames.get(type(data))
+
+        if fieldNames is None:
+            fieldNames=tuple(field.name for field in dataclasses.fields(data))
+            self._fieldNames[type(data)]=fieldNames
+
+        return fieldNames
+
+    def _hasChanged(self,key:tuple[str,str],previous,value) -> bool:
+        if previous == value:
+            return False
+
+        deadband=self._deadbands.get(key)
+
+        if deadband is None or previous is None or value is None or isinstance(value,bool):
+            return True
+
+        return abs(value-previous) > deadband
@@ -0,0 +1,75 @@
+from collections.abc import Callable
+from enum import StrEnum
+import time
+from typing import Any
+
+from .const import CIRCUIT_FAILURE_THRESHOLD,CIRCUIT_RESET_TIMEOUT,CIRCUIT_MAX_RESET_TIMEOUT
+
+class CircuitState(StrEnum):
+    CLOSED="closed"
+    OPEN="open"
+    HALF_OPEN="half_open"
+
+class CircuitBreaker:
+    """Stops requests to a failing logger for a while, then lets a probe poll through to test it"""
+
+    def __init__(self,failureThreshold:int=CIRCUIT_FAILURE_THRESHOLD,resetTimeout:float=CIRCUIT_RESET_TIMEOUT,maxResetTimeout:float=CIRCUIT_MAX_RESET_TIMEOUT,clock:Callable[[],float]=time.monotonic) -> None:
+        self._failureThreshold=max(1,failureThreshold)
+        self._baseResetTimeout=resetTimeout
+        self._maxResetTimeout=max(resetTimeout,maxResetTimeout)
+        self._clock=clock
+
+        self.state=CircuitState.CLOSED
+        self.consecutiveFailures=0
+        self.transitions=0
+        self._resetTimeout=resetTimeout
+        self._openedAt=0.0
+
+    def allowRequest(self) -> bool:
+        """Whether a request may go out, the first one after the reset timeout turns the circuit half-open"""
+        if self.state is CircuitState.OPEN:
+            if self._clock()-self._openedAt < self._resetTimeout:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+
+        #Half-open lets the probe poll's requests through, the first result decides
+        return True
+
+    def recordSuccess(self) -> None:
+        self.consecutiveFailures=0
+        self._resetTimeout=self._baseResetTimeout
+        if self.state is not CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def recordFailure(self) -> None:
+        self.consecutiveFailures+=1
+
+        if self.state is CircuitState.HALF_OPEN:
+            #The probe failed, stay away twice as long
+            self._resetTimeout=min(self._maxResetTimeout,self._resetTimeout*2)
+            self._open()
+        elif self.state is CircuitState.CLOSED and self.consecutiveFailures >= self._failureThreshold:
+            self._open()
+
+    def retryAfter(self) -> float:
+        """Seconds until a probe is allowed, 0 unless the circuit is open"""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0,self._openedAt+self._resetTimeout-self._clock())
+
+    def _open(self) -> None:
+        self._openedAt=self._clock()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self,state:CircuitState) -> None:
+        self.state=state
+        self.transitions+=1
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "state":self.state.value,
+            "consecutive_failures":self.consecutiveFailures,
+            "transitions":self.transitions,
+            "reset_timeout":self._resetTimeout,
+            "retry_after":round(self.retryAfter(),3)
+        }
@@ -1,19 +1,71 @@
 """Config flow for the Solis Wifi Data Logger platform."""
 
+import ipaddress
 import logging
+from urllib.parse import urlsplit
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import callback
 from aiohttp.client_exceptions import ClientConnectionError,ClientResponseError
 
-from .const import DOMAIN,DEFAULT_HOST,DEFAULT_USERNAME
+from .const import (
+    DOMAIN,
+    DEFAULT_HOST,
+    DEFAULT_USERNAME,
+    UNIQUE_ID_PREFIX,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_INVERTER_SCAN_INTERVAL,
+    DEFAULT_INVERTER_SCAN_INTERVAL,
+    CONF_LOGGER_SCAN_INTERVAL,
+    DEFAULT_LOGGER_SCAN_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    CONF_SIGNAL_QUALITY_DEADBAND,
+    DEFAULT_SIGNAL_QUALITY_DEADBAND,
+    CONF_RECORDER_PROFILE,
+    DEFAULT_RECORDER_PROFILE,
+    RECORDER_PROFILES,
+    CONF_TRANSPORT,
+    DEFAULT_TRANSPORT,
+    TRANSPORTS,
+    TRANSPORT_SOLARMAN_V5,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_FOLLOW_SUN,
+    DEFAULT_FOLLOW_SUN,
+    CONF_CAPTURE,
+    DEFAULT_CAPTURE,
+    CONF_STATISTICS,
+    DEFAULT_STATISTICS,
+    CONF_EXPORT_TARGET,
+    DEFAULT_EXPORT_TARGET,
+    CONF_EXPORT_DESTINATION,
+    DEFAULT_EXPORT_DESTINATION,
+    EXPORT_TARGETS,
+    EXPORT_TARGET_INFLUX_UDP,
+    EXPORT_TARGET_INFLUX_HTTP,
+    EXPORT_TARGET_FILE,
+    CONF_NETWORK,
+    DEFAULT_DISCOVERY_NETWORK
+)
 from .solis_wifi_api import(
     SolisWifiApiManager,
     WifiDataLoggerData,
     SolisWifiApiParseException
 ) 
+from .discovery import DiscoveredLogger,discoverLoggers
+from .solarman_v5 import (
+    SolarmanV5Client,
+    SolarmanV5FrameError,
+    INVERTER_REGISTERS_START
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,35 +88,116 @@ class FlowHandler(config_entries.ConfigFlow,domain=DOMAIN):
     def __init__(self):
         """Initialize the Solis Wifi Data Logger flow."""
         self.host = None
+        self._discovery_input = {}
+        self._discovered:dict[str,DiscoveredLogger] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry:config_entries.ConfigEntry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
 
     async def async_step_user(self, user_input=None):
-        """User initiated config flow."""
+        """User initiated config flow, discover the sticks on the network or enter a host."""
+        return self.async_show_menu(step_id="user", menu_options=["discover","manual"])
+
+    async def async_step_manual(self, user_input=None):
+        """Connect to the host entered by the user."""
         if user_input is not None:
-            user_input.get(CONF_HOST), user_input.get(CONF_USERNAME),user_input.get(CONF_PASSWORD)
-            
             data=await self._attempt_connection(
                 user_input.get(CONF_HOST), user_input.get(CONF_USERNAME),user_input.get(CONF_PASSWORD)
             )
 
             if type(data) is dict:
-                return self.async_show_form(step_id="user", data_schema=STEP_USER_DATA_SCHEMA,errors=data)
+                return self.async_show_form(step_id="manual", data_schema=STEP_USER_DATA_SCHEMA,errors=data)
             else:
                 return await self._create_entry(data.wifi_logger,user_input.get(CONF_HOST), user_input.get(CONF_USERNAME),user_input.get(CONF_PASSWORD))
 
-        return self.async_show_form(step_id="user", data_schema=STEP_USER_DATA_SCHEMA)
+        return self.async_show_form(step_id="manual", data_schema=STEP_USER_DATA_SCHEMA)
+
+    async def async_step_discover(self, user_input=None):
+        """Probe a subnet for sticks answering with the given credentials."""
+        errors = {}
+
+        if user_input is not None:
+            self._discovery_input = user_input
+            try:
+                loggers = await discoverLoggers(user_input[CONF_NETWORK],user_input[CONF_USERNAME],user_input[CONF_PASSWORD])
+            except ValueError as e:
+                _LOGGER.error(e)
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                configured = self._async_current_ids()
+                self._discovered = {
+                    logger.url:logger for logger in loggers
+                    if f"{UNIQUE_ID_PREFIX}{logger.serialNumber}" not in configured
+                }
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_loggers_found"
+
+        return await self._show_discover_form(errors)
+
+    async def async_step_pick(self, user_input=None):
+        """Pick one of the discovered sticks."""
+        errors = {}
+
+        if user_input is not None:
+            username = self._discovery_input[CONF_USERNAME]
+            password = self._discovery_input[CONF_PASSWORD]
+
+            data=await self._attempt_connection(user_input[CONF_HOST],username,password)
+            if type(data) is not dict:
+                return await self._create_entry(data.wifi_logger,user_input[CONF_HOST],username,password)
+
+            if CONF_PASSWORD in data:
+                #Wrong credentials for this stick, ask for them again
+                return await self._show_discover_form(data)
+            errors = data
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST):vol.In({url:_discovered_label(logger) for url,logger in self._discovered.items()})
+                }
+            ),
+            errors=errors
+        )
+
+    async def _show_discover_form(self, errors:dict[str,str]):
+        """Form for the subnet and credentials, filled in from the last attempt."""
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NETWORK,default=self._discovery_input.get(CONF_NETWORK) or await self._default_network()):str,
+                    vol.Required(CONF_USERNAME,default=self._discovery_input.get(CONF_USERNAME,DEFAULT_USERNAME)):str,
+                    vol.Required(CONF_PASSWORD):str
+                }
+            ),
+            errors=errors
+        )
+
+    async def _default_network(self) -> str:
+        """The /24 around Home Assistant's address on its default adapter, or on the first enabled one."""
+        adapters = sorted(await network.async_get_adapters(self.hass),key=lambda adapter:not adapter["default"])
+        for adapter in adapters:
+            for ipv4 in adapter["ipv4"] if adapter["enabled"] else ():
+                if not ipaddress.ip_address(ipv4["address"]).is_loopback:
+                    return str(ipaddress.ip_network(f"{ipv4['address']}/{max(ipv4['network_prefix'],24)}",strict=False))
+
+        return DEFAULT_DISCOVERY_NETWORK
 
     async def _create_entry(self,data:WifiDataLoggerData, hostname:str, username:str, password:str):
         """Register new entry."""
 
-        if self._async_current_entries():
-            return self.async_abort(reason="already_configured")
-
         if not self.unique_id:
-            await self.async_set_unique_id(f"SolisWifiDataLogger_{data.serial_number}")
+            await self.async_set_unique_id(f"{UNIQUE_ID_PREFIX}{data.serial_number}")
         self._abort_if_unique_id_configured()
 
         return self.async_create_entry(
-            title="SolisWifiDataLogger",
+            title=f"SolisWifiDataLogger {data.serial_number}",
             data={CONF_HOST: hostname, CONF_USERNAME: username, CONF_PASSWORD: password},
         )
 
@@ -91,4 +224,135 @@ class FlowHandler(config_entries.ConfigFlow,domain=DOMAIN):
                 return {"base":"unknown"}
 
 
-    
\ No newline at end of file
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the polling options."""
+
+    if not hasattr(config_entries.OptionsFlow, "config_entry"):
+        # Home Assistant provides config_entry on options flows since 2024.11
+        @property
+        def config_entry(self) -> config_entries.ConfigEntry:
+            return self.hass.config_entries.async_get_entry(self.handler)
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        errors = {}
+
+        if user_input is not None:
+            if not _valid_export_destination(user_input[CONF_EXPORT_TARGET],user_input.get(CONF_EXPORT_DESTINATION,"")):
+                errors[CONF_EXPORT_DESTINATION] = "invalid_export_destination"
+
+            if user_input[CONF_TRANSPORT] == TRANSPORT_SOLARMAN_V5:
+                if error := await self._attempt_solarman_v5_connection():
+                    errors[CONF_TRANSPORT] = error
+
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self.config_entry.options
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=options.get(CONF_MAX_CONCURRENT_REQUESTS,DEFAULT_MAX_CONCURRENT_REQUESTS)
+                    ):vol.All(vol.Coerce(int),vol.Range(min=1,max=4)),
+                    vol.Required(
+                        CONF_INVERTER_SCAN_INTERVAL,
+                        default=options.get(CONF_INVERTER_SCAN_INTERVAL,DEFAULT_INVERTER_SCAN_INTERVAL)
+                    ):vol.All(vol.Coerce(int),vol.Range(min=1,max=3600)),
+                    vol.Required(
+                        CONF_LOGGER_SCAN_INTERVAL,
+                        default=options.get(CONF_LOGGER_SCAN_INTERVAL,DEFAULT_LOGGER_SCAN_INTERVAL)
+                    ):vol.All(vol.Coerce(int),vol.Range(min=10,max=86400)),
+                    vol.Required(
+                        CONF_TRANSPORT,
+                        default=options.get(CONF_TRANSPORT,DEFAULT_TRANSPORT)
+                    ):vol.In(TRANSPORTS),
+                    vol.Required(
+                        CONF_TEMPERATURE_DEADBAND,
+                        default=options.get(CONF_TEMPERATURE_DEADBAND,DEFAULT_TEMPERATURE_DEADBAND)
+                    ):vol.All(vol.Coerce(float),vol.Range(min=0,max=10)),
+                    vol.Required(
+                        CONF_SIGNAL_QUALITY_DEADBAND,
+                        default=options.get(CONF_SIGNAL_QUALITY_DEADBAND,DEFAULT_SIGNAL_QUALITY_DEADBAND)
+                    ):vol.All(vol.Coerce(int),vol.Range(min=0,max=50)),
+                    vol.Required(
+                        CONF_RECORDER_PROFILE,
+                        default=options.get(CONF_RECORDER_PROFILE,DEFAULT_RECORDER_PROFILE)
+                    ):vol.In(RECORDER_PROFILES),
+                    vol.Required(
+                        CONF_ADAPTIVE_POLLING,
+                        default=options.get(CONF_ADAPTIVE_POLLING,DEFAULT_ADAPTIVE_POLLING)
+                    ):bool,
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=options.get(CONF_MAX_SCAN_INTERVAL,DEFAULT_MAX_SCAN_INTERVAL)
+                    ):vol.All(vol.Coerce(int),vol.Range(min=10,max=3600)),
+                    vol.Required(
+                        CONF_FOLLOW_SUN,
+                        default=options.get(CONF_FOLLOW_SUN,DEFAULT_FOLLOW_SUN)
+                    ):bool,
+                    vol.Required(
+                        CONF_EXPORT_TARGET,
+                        default=options.get(CONF_EXPORT_TARGET,DEFAULT_EXPORT_TARGET)
+                    ):vol.In(EXPORT_TARGETS),
+                    vol.Optional(
+                        CONF_EXPORT_DESTINATION,
+                        default=options.get(CONF_EXPORT_DESTINATION,DEFAULT_EXPORT_DESTINATION)
+                    ):str,
+                    vol.Required(
+                        CONF_CAPTURE,
+                        default=options.get(CONF_CAPTURE,DEFAULT_CAPTURE)
+                    ):bool,
+                    vol.Required(
+                        CONF_STATISTICS,
+                        default=options.get(CONF_STATISTICS,DEFAULT_STATISTICS)
+                    ):bool
+                }
+            ),
+            errors=errors
+        )
+
+    async def _attempt_solarman_v5_connection(self) -> str|None:
+        """Read one register over Solarman V5, addressed with the logger serial the entry was created with."""
+        logger_serial = (self.config_entry.unique_id or "").removeprefix(UNIQUE_ID_PREFIX)
+        if not logger_serial.isdigit() or int(logger_serial) >= 2**32:
+            return "invalid_logger_serial"
+
+        host = urlsplit(self.config_entry.data[CONF_HOST]).hostname or self.config_entry.data[CONF_HOST]
+        client = SolarmanV5Client(host,int(logger_serial))
+        try:
+            await client.readInputRegisters(INVERTER_REGISTERS_START,1)
+        except SolarmanV5FrameError as e:
+            _LOGGER.error(e)
+            return "solarman_v5_no_inverter"
+        except ClientConnectionError as e:
+            _LOGGER.error(e)
+            return "solarman_v5_cannot_connect"
+        finally:
+            await client.close()
+
+        return None
+
+def _discovered_label(logger:DiscoveredLogger) -> str:
+    """Serial and address of a discovered stick, sticks that rejected the credentials have no serial."""
+    host = urlsplit(logger.url).netloc
+    if logger.serialNumber is None:
+        return f"{host} (credentials rejected)"
+    return f"{logger.serialNumber} ({host})"
+
+def _valid_export_destination(target:str,destination:str) -> bool:
+    """host:port for UDP, an http(s) URL for HTTP and a file path for the file target."""
+    if target == EXPORT_TARGET_INFLUX_UDP:
+        host,_,port=destination.rpartition(":")
+        return bool(host) and port.isdigit() and 0 < int(port) < 65536
+
+    if target == EXPORT_TARGET_INFLUX_HTTP:
+        return destination.startswith(("http://","https://"))
+
+    if target == EXPORT_TARGET_FILE:
+        return bool(destination.strip())
+
+    return True
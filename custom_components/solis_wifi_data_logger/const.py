@@ -1,5 +1,5 @@
 DOMAIN="solis_wifi_data_logger"
-COORDINATOR="coordinator"
+SCHEDULER="scheduler"
 
 DEFAULT_HOST="lwip0"
 DEFAULT_USERNAME="admin"
@@ -8,7 +8,164 @@ ATTR_SERIAL_NUMBER="serial_number"
 ATTR_FIRMWARE_VERSION="firmware_version"
 ATTR_MODEL="model"
 ATTR_MAC_ADDRESS="mac_address"
+ATTR_LAST_SEEN="last_seen"
 
-JSON_CACHE_FILE="solis_init_data.json"
+UNIQUE_ID_PREFIX="SolisWifiDataLogger_"
+
+#Last known SystemData per logger, stored in HA's .storage directory
+CACHE_STORAGE_VERSION=1
+#Cache file of earlier versions, written to the working directory and shared by every logger, imported once
+LEGACY_CACHE_FILE="solis_init_data.json"
+CACHE_SAVE_DELAY=30
+#Version of SystemData.to_dict, bump when fields are removed or change type
+SYSTEM_DATA_SCHEMA_VERSION=1
+
+PLATFORMS=["binary_sensor","sensor"]
+
+DATA_SOURCE_INVERTER="inverter"
+DATA_SOURCE_WIFI_LOGGER="wifi_logger"
+
+#Keep-alive connection pool, the logger stick only copes with a couple of sockets
+CONNECTION_LIMIT_PER_HOST=2
+CONNECTION_KEEPALIVE_TIMEOUT=60
+
+#Per request timeouts in seconds, a hanging stick fails well inside the 20s poll timeout
+CONNECT_TIMEOUT=5
+READ_TIMEOUT=8
+
+#Optional inverter transport, Modbus input registers read over the stick's Solarman V5 TCP port,
+#the logger's own data still comes from moniter.cgi
+CONF_TRANSPORT="transport"
+TRANSPORT_HTTP="http"
+TRANSPORT_SOLARMAN_V5="solarman_v5"
+TRANSPORTS=[TRANSPORT_HTTP,TRANSPORT_SOLARMAN_V5]
+DEFAULT_TRANSPORT=TRANSPORT_HTTP
+SOLARMAN_V5_PORT=8899
+SOLARMAN_V5_SLAVE_ID=1
+
+#The circuit opens after CIRCUIT_FAILURE_THRESHOLD failed polls in a row, then a probe poll is let
+#through after CIRCUIT_RESET_TIMEOUT seconds, doubling up to CIRCUIT_MAX_RESET_TIMEOUT while probes fail
+CIRCUIT_FAILURE_THRESHOLD=3
+CIRCUIT_RESET_TIMEOUT=30
+CIRCUIT_MAX_RESET_TIMEOUT=300
+
+#Polls of all loggers falling due together are spread over POLL_STAGGER_WINDOW seconds
+MAX_CONCURRENT_POLLS=8
+POLL_STAGGER_WINDOW=1.0
+
+CONF_MAX_CONCURRENT_REQUESTS="max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS=2
+
+#Concurrent fetches fall back to sequential requests after CONCURRENT_FETCH_FAILURE_THRESHOLD polls in a row
+#failed the way an overloaded stick does, and are tried again CONCURRENT_FETCH_RETRY_INTERVAL seconds later
+CONCURRENT_FETCH_FAILURE_THRESHOLD=3
+CONCURRENT_FETCH_RETRY_INTERVAL=3600
+
+#Refreshes requested within MIN_REFRESH_AGE seconds of the last poll return its data
+#(capped at half the inverter scan interval so scheduled polls are never skipped)
+MIN_REFRESH_AGE=2
+
+#Polling intervals in seconds, inverter.cgi telemetry and moniter.cgi logger metadata
+CONF_INVERTER_SCAN_INTERVAL="inverter_scan_interval"
+DEFAULT_INVERTER_SCAN_INTERVAL=5
+CONF_LOGGER_SCAN_INTERVAL="logger_scan_interval"
+DEFAULT_LOGGER_SCAN_INTERVAL=300
+
+#Changes within the deadband are not written to the state machine, 0 disables the deadband
+CONF_TEMPERATURE_DEADBAND="temperature_deadband"
+DEFAULT_TEMPERATURE_DEADBAND=0.0
+CONF_SIGNAL_QUALITY_DEADBAND="signal_quality_deadband"
+DEFAULT_SIGNAL_QUALITY_DEADBAND=0
+
+#Recorder profiles, minimal publishes the attributes changing between polls as their own
+#diagnostic sensors so a new last_seen no longer writes the online status on every poll
+CONF_RECORDER_PROFILE="recorder_profile"
+RECORDER_PROFILE_STANDARD="standard"
+RECORDER_PROFILE_MINIMAL="minimal"
+RECORDER_PROFILES=[RECORDER_PROFILE_STANDARD,RECORDER_PROFILE_MINIMAL]
+DEFAULT_RECORDER_PROFILE=RECORDER_PROFILE_STANDARD
+VOLATILE_ATTRIBUTES=("last_seen","ip_address","router_ssid")
+#Smallest deadbands of the minimal profile
+RECORDER_MINIMAL_TEMPERATURE_DEADBAND=0.5
+RECORDER_MINIMAL_SIGNAL_QUALITY_DEADBAND=5
+
+#Exponential back off of the inverter polling while the stick is offline or producing nothing
+CONF_ADAPTIVE_POLLING="adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING=True
+CONF_MAX_SCAN_INTERVAL="max_scan_interval"
+DEFAULT_MAX_SCAN_INTERVAL=300
+CONF_FOLLOW_SUN="follow_sun"
+DEFAULT_FOLLOW_SUN=False
+SUN_ENTITY_ID="sun.sun"
+
+#In memory time series of the fast changing fields, raw samples at poll resolution
+#and (bucket seconds, bucket count) per roll-up tier: 4h raw at 5s, 1 day, 1 week and 30 days
+HISTORY_FIELDS=(("inverter","current_power"),("inverter","temperature"),("wifi_logger","signal_quality"))
+HISTORY_RAW="raw"
+HISTORY_RAW_SAMPLES=2880
+HISTORY_TIERS={"1m":(60,1440),"5m":(300,2016),"1h":(3600,720)}
+
+#Integrated energy between steps of daily_power_yield, which moves in ENERGY_YIELD_RESOLUTION kWh,
+#polls further apart than ENERGY_MAX_GAP seconds are not integrated
+ENERGY_YIELD_RESOLUTION=0.1
+ENERGY_MAX_GAP=900
+
+#Hourly energy and power statistics compiled by the integration and written as external statistics,
+#the sensors of STATISTICS_FIELDS then have no state class so the recorder does not compile them too
+CONF_STATISTICS="statistics"
+DEFAULT_STATISTICS=False
+STATISTICS_FIELDS=("current_power","daily_power_yield")
+STATISTICS_PERIOD=3600
+STATISTICS_MAX_GAP=900
+#daily_power_yield dropping by more than STATISTICS_RESET_TOLERANCE kWh is the inverter resetting its counter
+STATISTICS_RESET_TOLERANCE=0.1
+
+#Histogram upper bounds in seconds, request latencies and payload parse times
+METRICS_LATENCY_BUCKETS=(0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0,20.0)
+METRICS_PARSE_BUCKETS=(0.000005,0.00001,0.000025,0.00005,0.0001,0.00025,0.001)
+
+#Opt-in capture of the raw CGI responses, one file per logger in the CAPTURE_DIRECTORY of the
+#configuration directory, rotated at CAPTURE_MAX_BYTES keeping CAPTURE_BACKUPS older files
+CONF_CAPTURE="capture"
+DEFAULT_CAPTURE=False
+CAPTURE_DIRECTORY="solis_wifi_data_logger"
+CAPTURE_MAX_BYTES=1048576
+CAPTURE_BACKUPS=3
+
+#Optional streaming export of every polled sample
+CONF_EXPORT_TARGET="export_target"
+CONF_EXPORT_DESTINATION="export_destination"
+EXPORT_TARGET_NONE="none"
+EXPORT_TARGET_PROMETHEUS="prometheus"
+EXPORT_TARGET_INFLUX_UDP="influx_udp"
+EXPORT_TARGET_INFLUX_HTTP="influx_http"
+EXPORT_TARGET_FILE="file"
+EXPORT_TARGETS=[EXPORT_TARGET_NONE,EXPORT_TARGET_PROMETHEUS,EXPORT_TARGET_INFLUX_UDP,EXPORT_TARGET_INFLUX_HTTP,EXPORT_TARGET_FILE]
+DEFAULT_EXPORT_TARGET=EXPORT_TARGET_NONE
+DEFAULT_EXPORT_DESTINATION=""
+#Samples queued per logger before the oldest are dropped, flushed in batches every EXPORT_FLUSH_INTERVAL seconds
+EXPORT_QUEUE_SIZE=10000
+EXPORT_BATCH_SIZE=500
+EXPORT_FLUSH_INTERVAL=10
+EXPORT_MAX_RETRY_DELAY=300
+EXPORT_UDP_PAYLOAD_SIZE=1400
+PROMETHEUS_VIEW="prometheus_view"
+
+#Discovery of logger sticks on a subnet from the config flow, DISCOVERY_CONCURRENCY probes at a time
+#each giving up after DISCOVERY_CONNECT_TIMEOUT seconds to connect and DISCOVERY_TIMEOUT in total
+CONF_NETWORK="network"
+DEFAULT_DISCOVERY_NETWORK="192.168.1.0/24"
+DISCOVERY_CONCURRENCY=128
+DISCOVERY_CONNECT_TIMEOUT=1.0
+DISCOVERY_TIMEOUT=3.0
+DISCOVERY_MAX_HOSTS=1024
+#Realm of the stick's BasicAuth challenge, recognises a stick when the credentials are wrong
+DISCOVERY_REALM="USER LOGIN"
+
+SERVICE_GET_HISTORY="get_history"
+ATTR_CONFIG_ENTRY_ID="config_entry_id"
+ATTR_FIELD="field"
+ATTR_RESOLUTION="resolution"
+ATTR_SINCE="since"
 
 #cd /mn 
\ No newline at end of file
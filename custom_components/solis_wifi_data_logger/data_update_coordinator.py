@@ -1,35 +1,265 @@
+import asyncio
 import logging
-from datetime import timedelta
+import time
+import dataclasses
+from datetime import datetime,timedelta
 import async_timeout
-from aiohttp.client_exceptions import ClientConnectionError
-import aiofiles
-import orjson
+from aiohttp.client_exceptions import ClientConnectionError,ClientResponseError,ServerTimeoutError
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST,CONF_USERNAME,CONF_PASSWORD
+from homeassistant.core import HomeAssistant,Event,callback
+from homeassistant.components.sun import STATE_ABOVE_HORIZON,STATE_BELOW_HORIZON
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import homeassistant.util.dt as dt_util
 
-from .solis_wifi_api import SolisWifiApiManager,SystemData
-from .const import JSON_CACHE_FILE
+from .solis_wifi_api import SolisWifiApi,SystemData,SolisWifiApiParseException,SolisWifiApiCircuitOpenException
+from .solarman_v5 import SolarmanV5Api
+from .change_detection import SystemDataChangeDetector
+from .scheduler import SolisWifiApiScheduler
+from .polling import AdaptivePollInterval
+from .cache import SystemDataCache
+from .history import SystemDataHistory
+from .energy import EnergyIntegrator
+from .statistics import HourlyStatisticsCompiler
+from .metrics import PollMetrics
+from .circuit_breaker import CircuitBreaker
+from .offline import OfflineStateEngine
+from .capture import CaptureWriter
+from .exporter import SampleExporter,ExportSample,InfluxUdpSink,InfluxHttpSink,FileSink
+from .const import (
+    DOMAIN,
+    UNIQUE_ID_PREFIX,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_INVERTER_SCAN_INTERVAL,
+    DEFAULT_INVERTER_SCAN_INTERVAL,
+    CONF_LOGGER_SCAN_INTERVAL,
+    DEFAULT_LOGGER_SCAN_INTERVAL,
+    DATA_SOURCE_INVERTER,
+    DATA_SOURCE_WIFI_LOGGER,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    CONF_SIGNAL_QUALITY_DEADBAND,
+    DEFAULT_SIGNAL_QUALITY_DEADBAND,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_FOLLOW_SUN,
+    DEFAULT_FOLLOW_SUN,
+    SUN_ENTITY_ID,
+    MIN_REFRESH_AGE,
+    CONF_EXPORT_TARGET,
+    DEFAULT_EXPORT_TARGET,
+    CONF_EXPORT_DESTINATION,
+    DEFAULT_EXPORT_DESTINATION,
+    EXPORT_TARGET_INFLUX_UDP,
+    EXPORT_TARGET_INFLUX_HTTP,
+    EXPORT_TARGET_FILE,
+    CONF_RECORDER_PROFILE,
+    DEFAULT_RECORDER_PROFILE,
+    RECORDER_PROFILE_MINIMAL,
+    RECORDER_MINIMAL_TEMPERATURE_DEADBAND,
+    RECORDER_MINIMAL_SIGNAL_QUALITY_DEADBAND,
+    CONF_TRANSPORT,
+    DEFAULT_TRANSPORT,
+    TRANSPORT_SOLARMAN_V5,
+    CONF_CAPTURE,
+    DEFAULT_CAPTURE,
+    CAPTURE_DIRECTORY,
+    CONF_STATISTICS,
+    DEFAULT_STATISTICS
+)
 
 
 _LOGGER = logging.getLogger(__name__)
 
 class SolisWifiApiDataUpdateCoordinator(DataUpdateCoordinator[SystemData]):
 
-    def __init__(self, hass:HomeAssistant, hostname:str,username:str,password:str):
+    def __init__(self, hass:HomeAssistant, entry:ConfigEntry, scheduler:SolisWifiApiScheduler):
         """Initialize coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             # Name of the data. For logging purposes.
-            name="solis_wifi_api",
+            name=f"solis_wifi_api {entry.data[CONF_HOST]}",
             update_method=self.async_update_data,
-            # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=10)
+            # Polling interval of the fast inverter telemetry. Will only be polled if there are subscribers.
+            update_interval=timedelta(seconds=entry.options.get(CONF_INVERTER_SCAN_INTERVAL,DEFAULT_INVERTER_SCAN_INTERVAL))
         )
-        self._hostname=hostname
-        self._username=username
-        self._password=password
+        self._hostname=entry.data[CONF_HOST]
+        self._username=entry.data[CONF_USERNAME]
+        self._password=entry.data[CONF_PASSWORD]
+        self._max_concurrent_requests=entry.options.get(CONF_MAX_CONCURRENT_REQUESTS,DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self._entry_id=entry.entry_id
+
+        #Last known online data, in memory first and persisted per logger serial
+        serial_number=entry.unique_id.removeprefix(UNIQUE_ID_PREFIX) if entry.unique_id else entry.entry_id
+        self._cache=SystemDataCache(hass,serial_number)
+
+        #Staggers polls across loggers and owns the shared connection pool
+        self._scheduler=scheduler
+
+        #Logger metadata rarely changes so moniter.cgi is polled on its own slower schedule
+        self._logger_scan_interval=entry.options.get(CONF_LOGGER_SCAN_INTERVAL,DEFAULT_LOGGER_SCAN_INTERVAL)
+        self._logger_refreshed_at:float|None=None
+
+        #Data sources refreshed by the last update
+        self.refreshed_sources:set[str]=set()
+
+        #Fields that changed in the last update, entities not watching them skip the state write
+        self.changed_fields:set[tuple[str,str]]=set()
+
+        #The minimal profile moves the volatile attributes to their own sensors and widens the deadbands
+        self.recorder_profile=entry.options.get(CONF_RECORDER_PROFILE,DEFAULT_RECORDER_PROFILE)
+        temperature_deadband=entry.options.get(CONF_TEMPERATURE_DEADBAND,DEFAULT_TEMPERATURE_DEADBAND)
+        signal_quality_deadband=entry.options.get(CONF_SIGNAL_QUALITY_DEADBAND,DEFAULT_SIGNAL_QUALITY_DEADBAND)
+        if self.recorder_profile == RECORDER_PROFILE_MINIMAL:
+            temperature_deadband=max(temperature_deadband,RECORDER_MINIMAL_TEMPERATURE_DEADBAND)
+            signal_quality_deadband=max(signal_quality_deadband,RECORDER_MINIMAL_SIGNAL_QUALITY_DEADBAND)
+
+        self._change_detector=SystemDataChangeDetector({
+            (DATA_SOURCE_INVERTER,"temperature"):temperature_deadband,
+            (DATA_SOURCE_WIFI_LOGGER,"signal_quality"):signal_quality_deadband
+        })
+
+        #Back off while the stick is offline or the inverter idle, optionally following the sun
+        self._scan_interval=self.update_interval.total_seconds()
+        self._poll_interval:AdaptivePollInterval|None=None
+        self._unsub_sun=None
+        if entry.options.get(CONF_ADAPTIVE_POLLING,DEFAULT_ADAPTIVE_POLLING):
+            self._poll_interval=AdaptivePollInterval(
+                self.update_interval.total_seconds(),
+                entry.options.get(CONF_MAX_SCAN_INTERVAL,DEFAULT_MAX_SCAN_INTERVAL)
+            )
+            if entry.options.get(CONF_FOLLOW_SUN,DEFAULT_FOLLOW_SUN):
+                self._unsub_sun=async_track_state_change_event(hass,[SUN_ENTITY_ID],self._handle_sun_change)
+                #Also runs when setup fails and is retried, which never shuts this coordinator down
+                entry.async_on_unload(self._async_stop_following_sun)
+
+        #Long lived client on the shared keep-alive connection pool, the V5 transport reads
+        #the inverter over its own TCP connection addressed with the logger serial
+        self._solis_wifi_api:SolisWifiApi|None=None
+        self.transport=entry.options.get(CONF_TRANSPORT,DEFAULT_TRANSPORT)
+        self._logger_serial=serial_number
+
+        #Raw response bodies appended to a rotating file in the configuration directory, for replaying a misbehaving stick
+        self.capture:CaptureWriter|None=None
+        if entry.options.get(CONF_CAPTURE,DEFAULT_CAPTURE):
+            self.capture=CaptureWriter(hass.config.path(CAPTURE_DIRECTORY,f"{serial_number}.swdc"))
+
+        #Data loaded from the cache and not yet confirmed by a poll of the logger
+        self.is_stale=False
+
+        #Duration of the last successful poll in seconds
+        self.last_poll_duration:float|None=None
+
+        #Every polled sample of the fast changing fields, rolled up into min/max/mean tiers
+        self.history=SystemDataHistory()
+
+        #Today's energy at watt-hour resolution, integrated from current_power between daily_power_yield steps
+        self.energy=EnergyIntegrator()
+
+        #Hourly energy and power written as external statistics, only once the sum was restored from the recorder
+        self.statistics:HourlyStatisticsCompiler|None=None
+        self._statistics_restored=False
+        self._energy_statistic_id=f"{DOMAIN}:{serial_number.lower()}_energy"
+        self._power_statistic_id=f"{DOMAIN}:{serial_number.lower()}_power"
+        if entry.options.get(CONF_STATISTICS,DEFAULT_STATISTICS):
+            self.statistics=HourlyStatisticsCompiler()
+
+        #Latency, payload and error counters of the polls, for diagnostics
+        self.metrics=PollMetrics()
+
+        #Offline data published during an outage, built once from the last known data
+        self._offline_state=OfflineStateEngine()
+
+        #Stops requesting a failing logger, the next poll after the reset timeout is the probe
+        self.circuit_breaker=CircuitBreaker()
+
+        #Streams every polled sample to a metrics sink, the Prometheus target is served from self.data instead
+        self.export_target=entry.options.get(CONF_EXPORT_TARGET,DEFAULT_EXPORT_TARGET)
+        self.exporter=self._create_exporter(hass,entry.options.get(CONF_EXPORT_DESTINATION,DEFAULT_EXPORT_DESTINATION))
+        self._exporter_task:asyncio.Task|None=None
+
+        #Poll in flight shared by concurrent refreshes, and refreshes within the minimum age return the last data
+        self._poll_task:asyncio.Task[SystemData]|None=None
+        self._polled_at:datetime|None=None
+        self._min_refresh_age=min(timedelta(seconds=MIN_REFRESH_AGE),self.update_interval/2)
+
+    def _get_solis_wifi_api(self) -> SolisWifiApi:
+        if self._solis_wifi_api is None:
+            kwargs={
+                "session":self._scheduler.register(self._entry_id),
+                "maxConcurrentRequests":self._max_concurrent_requests,
+                "metrics":self.metrics,
+                "circuitBreaker":self.circuit_breaker,
+                "capture":self.capture
+            }
+
+            if self.transport == TRANSPORT_SOLARMAN_V5:
+                self._solis_wifi_api=SolarmanV5Api(self._hostname,self._username,self._password,int(self._logger_serial),**kwargs)
+            else:
+                self._solis_wifi_api=SolisWifiApi(self._hostname,self._username,self._password,**kwargs)
+
+        return self._solis_wifi_api
+
+    async def _async_close_solis_wifi_api(self) -> None:
+        if self._solis_wifi_api is not None:
+            solis_wifi_api=self._solis_wifi_api
+            self._solis_wifi_api=None
+            await solis_wifi_api.close()
+
+    def _create_exporter(self,hass:HomeAssistant,destination:str) -> SampleExporter|None:
+        if self.export_target == EXPORT_TARGET_INFLUX_UDP:
+            host,_,port=destination.rpartition(":")
+            return SampleExporter(InfluxUdpSink(host,int(port)))
+
+        if self.export_target == EXPORT_TARGET_INFLUX_HTTP:
+            return SampleExporter(InfluxHttpSink(async_get_clientsession(hass),destination))
+
+        if self.export_target == EXPORT_TARGET_FILE:
+            #Relative paths are kept in the configuration directory
+            return SampleExporter(FileSink(hass.config.path(destination)))
+
+        return None
+
+    @callback
+    def async_start_exporter(self,entry:ConfigEntry) -> None:
+        """Start flushing exported samples in the background."""
+        if self.exporter is not None:
+            self._exporter_task=entry.async_create_background_task(
+                self.hass,self.exporter.run(),f"{entry.domain} exporter {entry.entry_id}"
+            )
+
+    async def async_load_cache(self) -> SystemData|None:
+        """Load the persisted last known data, done once at setup."""
+        return await self._cache.async_load()
+
+    @callback
+    def async_set_stale_data(self,data:SystemData) -> None:
+        """Use cached data to build the entities before the first poll, they stay unavailable until it completes."""
+        self.data=data
+        self.is_stale=True
+
+    async def _async_refresh(
+        self,
+        log_failures:bool=True,
+        raise_on_auth_failed:bool=False,
+        scheduled:bool=False,
+        raise_on_entry_error:bool=False
+    ) -> None:
+        #Single flight, a refresh requested while a poll is running waits for it, the refresh that started
+        #the poll stores its result, reschedules and notifies the listeners once for all of them
+        if self._poll_task is not None and not self._shutdown_requested:
+            _LOGGER.debug(f"Joining the poll of {self._hostname} in flight")
+            await asyncio.wait([self._poll_task])
+            return
+
+        await super()._async_refresh(log_failures,raise_on_auth_failed,scheduled,raise_on_entry_error)
 
     async def async_update_data(self):
         """Fetch data from the Solis Wifi Data Logger all at once and make it available for
@@ -37,27 +267,250 @@ class SolisWifiApiDataUpdateCoordinator(DataUpdateCoordinator[SystemData]):
         """
         _LOGGER.debug(f"Executing async_update_data()")
 
+        #Refreshes joining a poll in flight do not get here, anything else calling in shares its result too
+        if self._poll_task is not None:
+            _LOGGER.debug(f"Joining the poll of {self._hostname} in flight")
+            return await asyncio.shield(self._poll_task)
+
+        if self._poll_is_fresh():
+            _LOGGER.debug(f"Skipping refresh of {self._hostname}, polled less than {self._min_refresh_age.total_seconds()}s ago")
+            self.refreshed_sources=set()
+            self.changed_fields=set()
+            return self.data
+
+        self._poll_task=self.hass.async_create_task(self._async_poll())
+        self._poll_task.add_done_callback(self._poll_task_done)
+
+        #Shielded so a caller timing out does not cancel the poll the others are waiting on
+        return await asyncio.shield(self._poll_task)
+
+    def _poll_is_fresh(self) -> bool:
+        if self.data is None or self.is_stale or self._polled_at is None:
+            return False
+
+        #Same clock as the coordinator's own scheduling
+        return timedelta(0) <= dt_util.utcnow()-self._polled_at < self._min_refresh_age
+
+    @callback
+    def _poll_task_done(self,task:asyncio.Task) -> None:
+        if self._poll_task is task:
+            self._poll_task=None
+
+        #Retrieve the error of a poll every caller stopped waiting for
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_poll(self) -> SystemData:
+
+        solis_wifi_api=self._get_solis_wifi_api()
+        self.refreshed_sources=set()
+        self.changed_fields=set()
+
         try:
-            async with async_timeout.timeout(20):
+            async with self._scheduler.pollSlot(), async_timeout.timeout(20):
 
-                async with SolisWifiApiManager(self._hostname,self._username,self._password) as solis_wifi_api:
-                    system_data = await solis_wifi_api.getSystemData()
+                start=time.perf_counter()
+                system_data = await self._async_fetch_system_data(solis_wifi_api)
+                self.last_poll_duration=time.perf_counter()-start
+                self.metrics.recordPoll(self.last_poll_duration)
+                self.circuit_breaker.recordSuccess()
 
-                    #Cache first time state
-                    if self.data == None:
-                        await self._cache_system_data(system_data)
-                
+                self._offline_state.recovered()
+                self._cache.async_update(system_data)
+                self.history.record(system_data,time.time(),self.refreshed_sources)
+
+                _LOGGER.debug(f"Polled {self._hostname} in {self.last_poll_duration:.3f}s")
                 _LOGGER.debug(f"inverter_data: {system_data.inverter}")
                 _LOGGER.debug(f"wifi_logger_data: {system_data.wifi_logger}")
-        except ClientConnectionError:
-                #Cache last known state from memory
-                if self.data != None and self.data.wifi_logger.online_status:
-                        await self._cache_system_data(self.data)
+        except ClientResponseError:
+                self.metrics.recordPollError("http")
+                raise
+        except ClientConnectionError as e:
+                #A read timeout of a hung stick is a ClientConnectionError as well as a TimeoutError, it takes the offline path
+                if isinstance(e,SolisWifiApiCircuitOpenException):
+                        self.metrics.recordPollError("circuit_open")
+                else:
+                        self.metrics.recordPollError("timeout" if isinstance(e,ServerTimeoutError) else "connection")
+                        #Counted once per poll, however many of its requests failed
+                        self.circuit_breaker.recordFailure()
+
+                #Only the first failed poll of an outage changes anything
+                if not self._offline_state.inOutage:
+                        #Persist the last known state, including when it was last seen
+                        if self.data != None and self.data.wifi_logger.online_status and not self.is_stale:
+                                self._cache.async_schedule_save()
+
+                        self.refreshed_sources={DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER}
+                        self._logger_refreshed_at=None
+
+                last_known_system_data=self.data if self.data != None else self._cache.data
+
+                system_data=self._offline_state.offlineData(last_known_system_data)
+        except asyncio.TimeoutError:
+                self.metrics.recordPollError("timeout")
+                self.circuit_breaker.recordFailure()
+                raise
+        except SolisWifiApiParseException:
+                self.metrics.recordPollError("parse")
+                self.circuit_breaker.recordFailure()
+                raise
+
+        self.changed_fields=self._change_detector.detect(system_data,self.refreshed_sources)
+        self.energy.update(system_data,time.monotonic(),dt_util.now().date().toordinal())
 
-                system_data= await solis_wifi_api.getOffLineData(self.data)
+        if self.statistics is not None:
+            self.statistics.update(system_data,time.time(),dt_util.now().date().toordinal())
+            self._async_write_statistics()
+
+        if self.exporter is not None and self.refreshed_sources:
+            self.exporter.offer(ExportSample(time.time(),system_data))
+        self.is_stale=False
+        self._polled_at=dt_util.utcnow()
+
+        interval=self._scan_interval
+        if self._poll_interval is not None:
+            interval=self._poll_interval.update(system_data,self._sun_below_horizon())
+
+        #No point polling before the circuit lets a probe through
+        self.update_interval=timedelta(seconds=max(interval,self.circuit_breaker.retryAfter()))
 
         return system_data
-    
-    async def _cache_system_data(self,data:SystemData) -> None :
-        async with aiofiles.open(JSON_CACHE_FILE, mode='wb') as f:
-            await f.write(orjson.dumps(data))
\ No newline at end of file
+
+    async def async_load_statistics(self) -> None:
+        """Continue the energy sum from the last hour written, done once at setup."""
+        if self.statistics is None:
+            return
+
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning(f"Statistics of {self._hostname} need the recorder, which is not loaded")
+            self.statistics=None
+            return
+
+        #Imported here, the recorder is only an after dependency
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        last_statistics=await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics,self.hass,1,self._energy_statistic_id,True,{"state","sum"}
+        )
+
+        if rows := last_statistics.get(self._energy_statistic_id):
+            start=rows[0]["start"]
+            day=dt_util.as_local(dt_util.utc_from_timestamp(start)).date().toordinal()
+            self.statistics.restore(start,rows[0].get("state"),rows[0].get("sum"),day)
+
+        self._statistics_restored=True
+
+    @callback
+    def _async_write_statistics(self,include_current:bool=False) -> None:
+        #One import job per statistic for every hour completed since the last write
+        if not self._statistics_restored:
+            return
+
+        rows=self.statistics.drain(include_current)
+        if not rows:
+            return
+
+        from homeassistant.components.recorder.models import StatisticData,StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"Solis Inverter {self._logger_serial} Energy",
+                source=DOMAIN,
+                statistic_id=self._energy_statistic_id,
+                unit_of_measurement="kWh"
+            ),
+            [StatisticData(start=dt_util.utc_from_timestamp(row.start),state=row.state,sum=row.sum) for row in rows]
+        )
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"Solis Inverter {self._logger_serial} Power",
+                source=DOMAIN,
+                statistic_id=self._power_statistic_id,
+                unit_of_measurement="W"
+            ),
+            [StatisticData(start=dt_util.utc_from_timestamp(row.start),mean=row.mean,min=row.minimum,max=row.maximum) for row in rows]
+        )
+
+    def _sun_below_horizon(self) -> bool:
+        if self._unsub_sun is None:
+            return False
+
+        sun=self.hass.states.get(SUN_ENTITY_ID)
+        return sun is not None and sun.state == STATE_BELOW_HORIZON
+
+    @callback
+    def _handle_sun_change(self,event:Event) -> None:
+        new_state=event.data.get("new_state")
+
+        if new_state is not None and new_state.state == STATE_ABOVE_HORIZON:
+            #Sunrise, probe quickly for the stick waking up
+            self._poll_interval.reset()
+            self.update_interval=timedelta(seconds=self._poll_interval.interval)
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_stop_following_sun(self) -> None:
+        if self._unsub_sun is not None:
+            self._unsub_sun()
+            self._unsub_sun=None
+
+    def has_changed(self,data_source:str,field_names:list[str]) -> bool:
+        """Whether any of the fields of the data source changed in the last update."""
+        return any((data_source,field_name) in self.changed_fields for field_name in field_names)
+
+    async def _async_fetch_system_data(self,solis_wifi_api:SolisWifiApi) -> SystemData:
+
+        if self._logger_refresh_due():
+            system_data = await solis_wifi_api.getSystemData()
+            self._logger_refreshed_at=time.monotonic()
+            self.refreshed_sources={DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER}
+            return system_data
+
+        inverter_data = await solis_wifi_api.getInverterData()
+        self.refreshed_sources={DATA_SOURCE_INVERTER}
+
+        #The stick answered, so it is still online
+        wifi_logger_data = dataclasses.replace(self.data.wifi_logger,last_seen=datetime.now())
+
+        return SystemData(inverter_data,wifi_logger_data)
+
+    def _logger_refresh_due(self) -> bool:
+        if self.data is None or not self.data.wifi_logger.online_status or self._logger_refreshed_at is None:
+            return True
+
+        return time.monotonic()-self._logger_refreshed_at >= self._logger_scan_interval
+
+    async def async_shutdown(self) -> None:
+        """Cancel polling, release the shared connection pool and persist the last known data."""
+        await super().async_shutdown()
+
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+
+        self._async_stop_following_sun()
+
+        await self._async_close_solis_wifi_api()
+
+        if self._exporter_task is not None:
+            self._exporter_task.cancel()
+            self._exporter_task=None
+        if self.exporter is not None:
+            await self.exporter.close()
+
+        if self.capture is not None:
+            await self.capture.close()
+
+        #The hour being filled is written too, the next setup carries on from its sum
+        if self.statistics is not None:
+            self._async_write_statistics(include_current=True)
+
+        await self._scheduler.unregister(self._entry_id)
+        await self._cache.async_flush()
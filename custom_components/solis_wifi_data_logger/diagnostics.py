@@ -5,7 +5,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
 
-from .const import DOMAIN,COORDINATOR
+from .const import DOMAIN
 from .data_update_coordinator import SolisWifiApiDataUpdateCoordinator
 
 async def async_get_config_entry_diagnostics(
@@ -14,6 +14,21 @@ async def async_get_config_entry_diagnostics(
     """Return diagnostics for a config entry."""
     data = {}
     data["config_data"] = entry.as_dict()
+    coordinator: SolisWifiApiDataUpdateCoordinator | None = hass.data[DOMAIN].get(entry.entry_id)
+
+    if coordinator is not None:
+        data["metrics"] = coordinator.metrics.toDict()
+        data["circuit_breaker"] = coordinator.circuit_breaker.toDict()
+
+        if coordinator.exporter is not None:
+            data["exporter"] = coordinator.exporter.toDict()
+
+        if coordinator.capture is not None:
+            data["capture"] = coordinator.capture.toDict()
+
+        if coordinator.statistics is not None:
+            data["statistics"] = coordinator.statistics.toDict()
+
     return data
 
 
@@ -23,12 +38,12 @@ async def async_get_device_diagnostics(
     """Return diagnostics for a device entry."""
     data = {}
     data["config_data"] = entry.as_dict()
-    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][COORDINATOR]
+    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     if device.name.startswith("Solis Wifi"):
-        data["device_data"] = vars(coordinator.data.wifi_logger)
+        data["device_data"] = coordinator.data.wifi_logger.to_dict()
 
     if device.name.startswith("Solis Inverter"):
-        data["device_data"] = vars(coordinator.data.inverter)
+        data["device_data"] = coordinator.data.inverter.to_dict()
 
     return data
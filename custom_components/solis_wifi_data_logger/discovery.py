@@ -0,0 +1,84 @@
+"""Discovery of logger sticks by probing every address of a subnet for moniter.cgi.
+
+A stick answers with its moniter.cgi payload, which carries the logger serial,
+or with a BasicAuth challenge in its own realm when the credentials are wrong.
+Probes run concurrently behind a semaphore with short connect timeouts, so an
+address that does not answer costs at most DISCOVERY_CONNECT_TIMEOUT.
+"""
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import logging
+
+import aiohttp
+
+from .cgi_schema import MONITER_SCHEMA
+from .const import (
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_CONNECT_TIMEOUT,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_REALM
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(slots=True,frozen=True)
+class DiscoveredLogger:
+    url:str
+    #None when the stick was recognised by its login realm but rejected the credentials
+    serialNumber:str|None
+
+def discoveryHosts(network:str) -> list[str]:
+    """Addresses of the network to probe, raises ValueError for an invalid or too large network"""
+    parsed=ipaddress.ip_network(network.strip(),strict=False)
+    if parsed.num_addresses > DISCOVERY_MAX_HOSTS+2:
+        raise ValueError(f"{network} has more than {DISCOVERY_MAX_HOSTS} addresses")
+
+    return [str(address) for address in parsed.hosts()] or [str(parsed.network_address)]
+
+async def probeHost(session:aiohttp.ClientSession,host:str,auth:aiohttp.BasicAuth,semaphore:asyncio.Semaphore,port:int=80) -> DiscoveredLogger|None:
+    """Fingerprint a Solis stick from its moniter.cgi payload, or from its login realm when the credentials are wrong"""
+    url=f"http://{host}/" if port == 80 else f"http://{host}:{port}/"
+    timeout=aiohttp.ClientTimeout(total=DISCOVERY_TIMEOUT,sock_connect=DISCOVERY_CONNECT_TIMEOUT)
+
+    async with semaphore:
+        try:
+            async with session.get(f"{url}moniter.cgi",auth=auth,timeout=timeout,allow_redirects=False) as response:
+                if response.status == 401:
+                    realm=response.headers.get("WWW-Authenticate","")
+                    return DiscoveredLogger(url,None) if f'realm="{DISCOVERY_REALM}"' in realm else None
+
+                if response.status != 200:
+                    return None
+
+                body=await response.read()
+        except (aiohttp.ClientError,asyncio.TimeoutError,ValueError):
+            return None
+
+    try:
+        return DiscoveredLogger(url,MONITER_SCHEMA.parse(body)["serial_number"])
+    except ValueError:
+        #Answers moniter.cgi, but not the way a Solis stick does
+        return None
+
+async def discoverLoggers(network:str,username:str,password:str,concurrency:int=DISCOVERY_CONCURRENCY,port:int=80,session:aiohttp.ClientSession|None=None) -> list[DiscoveredLogger]:
+    """Probe every address of the network concurrently, returns the sticks found in address order"""
+    hosts=discoveryHosts(network)
+    semaphore=asyncio.Semaphore(max(1,concurrency))
+    auth=aiohttp.BasicAuth(username,password)
+
+    ownSession=session is None
+    if ownSession:
+        #One request per address, nothing to keep alive
+        session=aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max(1,concurrency),force_close=True))
+
+    try:
+        results=await asyncio.gather(*(probeHost(session,host,auth,semaphore,port) for host in hosts))
+    finally:
+        if ownSession:
+            await session.close()
+
+    loggers=[result for result in results if result is not None]
+    _LOGGER.debug(f"Discovery of {network} probed {len(hosts)} addresses and found {len(loggers)} loggers")
+    return loggers
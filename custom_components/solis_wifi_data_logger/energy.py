@@ -0,0 +1,85 @@
+from typing import Any
+
+from .solis_wifi_api import SystemData
+from .const import ENERGY_MAX_GAP,ENERGY_YIELD_RESOLUTION
+
+class EnergyIntegrator:
+    """Today's energy in Wh, daily_power_yield refined by the trapezoidal integral of current_power since it last stepped"""
+
+    def __init__(self,maxGap:float=ENERGY_MAX_GAP,yieldResolution:float=ENERGY_YIELD_RESOLUTION) -> None:
+        self._maxGap=maxGap
+        self._yieldResolutionWh=yieldResolution*1000
+        self._anchorWh:float|None=None
+        self._integratedWh=0.0
+        #Energy counted before the inverter reset its counter within the same day
+        self._offsetWh=0.0
+        self._day:int|None=None
+        self._lastTime:float|None=None
+        self._lastPower=0.0
+        self.energy:float|None=None
+
+    def update(self,systemData:SystemData,timestamp:float,day:int) -> float|None:
+        """Add a poll result taken at the monotonic timestamp on the local day ordinal, returns the energy in Wh"""
+        if not systemData.wifi_logger.online_status:
+            #Offline placeholders report 0 for everything, neither integrate them nor take them as a new day
+            self._lastTime=None
+            return self.energy
+
+        inverter=systemData.inverter
+        yieldWh=round(inverter.daily_power_yield*1000,3)
+        power=max(0.0,inverter.current_power)
+
+        if self._day != day and (self._anchorWh is None or yieldWh < self._anchorWh):
+            #First sample of a day, or the inverter reset its daily counter at midnight
+            self._anchorWh=yieldWh
+            self._integratedWh=0.0
+            self._offsetWh=0.0
+            self._day=day
+            self.energy=None
+        elif yieldWh < self._anchorWh:
+            #Counter reset within the day, carry on from the energy already published so the total never drops
+            self._offsetWh=self.energy or 0.0
+            self._anchorWh=yieldWh
+            self._integratedWh=0.0
+        elif yieldWh > self._anchorWh:
+            #The counter stepped, it is exact again at this point
+            self._anchorWh=yieldWh
+            self._integratedWh=0.0
+        elif self._lastTime is not None and 0 < timestamp-self._lastTime <= self._maxGap:
+            self._integratedWh+=(self._lastPower+power)/2*(timestamp-self._lastTime)/3600
+            #Cannot have produced a full step without the counter moving
+            self._integratedWh=min(self._integratedWh,self._yieldResolutionWh)
+
+        self._lastTime=timestamp
+        self._lastPower=power
+
+        energy=self._offsetWh+self._anchorWh+self._integratedWh
+        self.energy=energy if self.energy is None else max(self.energy,energy)
+
+        return self.energy
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "day":self._day,
+            "anchor_wh":self._anchorWh,
+            "integrated_wh":self._integratedWh,
+            "offset_wh":self._offsetWh,
+            "energy":self.energy
+        }
+
+    def restore(self,data:dict[str,Any],day:int) -> None:
+        """Continue today's energy from toDict output, data of an earlier day is ignored"""
+        if data.get("day") != day or data.get("anchor_wh") is None:
+            return
+
+        if self._day == day and self._anchorWh is not None:
+            #Already polled today, only hold on to the energy published before
+            if data.get("energy") is not None:
+                self.energy=max(self.energy or 0.0,float(data["energy"]))
+            return
+
+        self._day=day
+        self._anchorWh=float(data["anchor_wh"])
+        self._integratedWh=float(data.get("integrated_wh") or 0.0)
+        self._offsetWh=float(data.get("offset_wh") or 0.0)
+        self.energy=None if data.get("energy") is None else float(data["energy"])
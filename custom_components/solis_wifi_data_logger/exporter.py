@@ -0,0 +1,216 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+from typing import Any,Protocol
+
+import aiohttp
+
+from .solis_wifi_api import SystemData
+from .const import (
+    EXPORT_QUEUE_SIZE,
+    EXPORT_BATCH_SIZE,
+    EXPORT_FLUSH_INTERVAL,
+    EXPORT_MAX_RETRY_DELAY,
+    EXPORT_UDP_PAYLOAD_SIZE
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(slots=True,frozen=True)
+class ExportSample:
+    timestamp:float
+    systemData:SystemData
+
+def _escapeTag(value:str) -> str:
+    return value.replace("\\","\\\\").replace(",","\\,").replace("=","\\=").replace(" ","\\ ")
+
+def toLineProtocol(sample:ExportSample) -> str:
+    """InfluxDB line protocol of a sample, offline samples only carry online=false"""
+    systemData=sample.systemData
+    inverter=systemData.inverter
+    wifiLogger=systemData.wifi_logger
+
+    tags=f"solis,logger={_escapeTag(wifiLogger.serial_number or 'unknown')}"
+    if inverter.serial_number:
+        tags+=f",inverter={_escapeTag(inverter.serial_number)}"
+
+    if wifiLogger.online_status:
+        fields=(
+            f"online=true,current_power={float(inverter.current_power)},temperature={float(inverter.temperature)},"
+            f"daily_power_yield={float(inverter.daily_power_yield)},signal_quality={int(wifiLogger.signal_quality)}i"
+        )
+        if inverter.alerts is not None:
+            fields+=f",alerts={'true' if inverter.alerts else 'false'}"
+    else:
+        fields="online=false"
+
+    return f"{tags} {fields} {int(sample.timestamp*1e9)}"
+
+def _escapeLabel(value:str) -> str:
+    return value.replace("\\","\\\\").replace("\"","\\\"").replace("\n","\\n")
+
+PROMETHEUS_METRICS=(
+    ("solis_online","Whether the logger answered the last poll",lambda data: int(data.wifi_logger.online_status)),
+    ("solis_current_power_watts","Inverter output power",lambda data: data.inverter.current_power),
+    ("solis_temperature_celsius","Inverter temperature",lambda data: data.inverter.temperature),
+    ("solis_daily_power_yield_kwh","Energy produced today, resets daily",lambda data: data.inverter.daily_power_yield),
+    ("solis_signal_quality_percent","Logger wifi signal quality",lambda data: data.wifi_logger.signal_quality),
+)
+
+def toPrometheusText(samples:list[SystemData]) -> str:
+    """Prometheus text exposition of the latest sample of each logger"""
+    lines=[]
+    for name,description,value in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+        for systemData in samples:
+            if name != "solis_online" and not systemData.wifi_logger.online_status:
+                continue
+            labels=f'logger="{_escapeLabel(systemData.wifi_logger.serial_number)}",inverter="{_escapeLabel(systemData.inverter.serial_number)}"'
+            lines.append(f"{name}{{{labels}}} {value(systemData)}")
+
+    return "\n".join(lines)+"\n"
+
+class ExportSink(Protocol):
+    async def write(self,lines:list[str]) -> None: ...
+    async def close(self) -> None: ...
+
+class InfluxUdpSink:
+    """Line protocol datagrams to an InfluxDB/Telegraf UDP listener"""
+
+    def __init__(self,host:str,port:int) -> None:
+        self._address=(host,port)
+        self._transport:asyncio.DatagramTransport|None=None
+
+    async def write(self,lines:list[str]) -> None:
+        if self._transport is None or self._transport.is_closing():
+            self._transport,_=await asyncio.get_running_loop().create_datagram_endpoint(asyncio.DatagramProtocol,remote_addr=self._address)
+
+        #Pack lines into datagrams that fit a single ethernet frame
+        payload=b""
+        for line in lines:
+            encoded=line.encode()+b"\n"
+            if payload and len(payload)+len(encoded) > EXPORT_UDP_PAYLOAD_SIZE:
+                self._transport.sendto(payload)
+                payload=b""
+            payload+=encoded
+        if payload:
+            self._transport.sendto(payload)
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport=None
+
+class InfluxHttpSink:
+    """Line protocol batches POSTed to an InfluxDB write URL, e.g. http://influxdb:8086/write?db=solar"""
+
+    def __init__(self,session:aiohttp.ClientSession,url:str) -> None:
+        self._session=session
+        self._url=url
+        self._timeout=aiohttp.ClientTimeout(total=10)
+
+    async def write(self,lines:list[str]) -> None:
+        async with self._session.post(self._url,data="\n".join(lines).encode(),timeout=self._timeout) as response:
+            response.raise_for_status()
+
+    async def close(self) -> None:
+        #The session belongs to the caller
+        pass
+
+class FileSink:
+    """Line protocol appended to a local file, written in the executor"""
+
+    def __init__(self,path:str) -> None:
+        self._path=path
+
+    def _append(self,data:str) -> None:
+        with open(self._path,"a",encoding="utf-8") as f:
+            f.write(data)
+
+    async def write(self,lines:list[str]) -> None:
+        await asyncio.get_running_loop().run_in_executor(None,self._append,"".join(line+"\n" for line in lines))
+
+    async def close(self) -> None:
+        pass
+
+class SampleExporter:
+    """Bounded queue of samples flushed in batches to a sink by a background task, the oldest samples are dropped on overflow"""
+
+    def __init__(self,sink:ExportSink,maxQueue:int=EXPORT_QUEUE_SIZE,batchSize:int=EXPORT_BATCH_SIZE,flushInterval:float=EXPORT_FLUSH_INTERVAL) -> None:
+        self._sink=sink
+        self._queue:deque[ExportSample]=deque(maxlen=max(1,maxQueue))
+        self._batchSize=max(1,batchSize)
+        self._flushInterval=flushInterval
+        self._batchReady=asyncio.Event()
+        self._retryDelay=0.0
+
+        self.exported=0
+        self.dropped=0
+        self.failures=0
+
+    def offer(self,sample:ExportSample) -> None:
+        """Queue a sample without blocking, evicting the oldest one when full"""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped+=1
+        self._queue.append(sample)
+
+        if len(self._queue) >= self._batchSize:
+            self._batchReady.set()
+
+    async def run(self) -> None:
+        """Flush every flushInterval or as soon as a batch is full, until cancelled"""
+        while True:
+            if self._retryDelay:
+                #Backing off from a failing sink, full batches keep queueing meanwhile
+                await asyncio.sleep(self._retryDelay)
+            else:
+                try:
+                    await asyncio.wait_for(self._batchReady.wait(),self._flushInterval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batchReady.clear()
+
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Write everything queued, returns False when the sink failed and the samples were put back"""
+        while self._queue:
+            batch=[self._queue.popleft() for _ in range(min(self._batchSize,len(self._queue)))]
+            try:
+                await self._sink.write([toLineProtocol(sample) for sample in batch])
+            except (OSError,aiohttp.ClientError,asyncio.TimeoutError) as e:
+                self._requeue(batch)
+                self.failures+=1
+                if not self._retryDelay:
+                    _LOGGER.warning(f"Exporting samples failed, retrying with back off: {e!r}")
+                self._retryDelay=min(EXPORT_MAX_RETRY_DELAY,max(self._flushInterval,self._retryDelay*2))
+                return False
+
+            self.exported+=len(batch)
+            self._retryDelay=0.0
+
+        return True
+
+    def _requeue(self,batch:list[ExportSample]) -> None:
+        #The batch is older than anything queued since, so it is what gets dropped when there is no room
+        room=self._queue.maxlen-len(self._queue)
+        if len(batch) > room:
+            self.dropped+=len(batch)-room
+            batch=batch[len(batch)-room:]
+        self._queue.extendleft(reversed(batch))
+
+    async def close(self) -> None:
+        """Final flush attempt, then release the sink"""
+        await self.flush()
+        await self._sink.close()
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "queued":len(self._queue),
+            "exported":self.exported,
+            "dropped":self.dropped,
+            "failures":self.failures,
+            "retry_delay":self._retryDelay
+        }
@@ -0,0 +1,141 @@
+from array import array
+from dataclasses import dataclass
+
+from .solis_wifi_api import SystemData
+from .const import HISTORY_FIELDS,HISTORY_RAW_SAMPLES,HISTORY_TIERS
+
+@dataclass(slots=True,frozen=True)
+class HistoryBucket:
+    start:float
+    minimum:float
+    maximum:float
+    mean:float
+    count:int
+
+def _zeros(typecode:str,capacity:int) -> array:
+    return array(typecode,bytes(array(typecode).itemsize*capacity))
+
+class SampleRing:
+    """Fixed size ring of (timestamp,value) samples backed by two double arrays"""
+
+    def __init__(self,capacity:int) -> None:
+        self._capacity=capacity
+        self._times=_zeros("d",capacity)
+        self._values=_zeros("d",capacity)
+        self._next=0
+        self._size=0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self,timestamp:float,value:float) -> None:
+        self._times[self._next]=timestamp
+        self._values[self._next]=value
+        self._next=(self._next+1)%self._capacity
+        self._size=min(self._size+1,self._capacity)
+
+    def samples(self,since:float=0.0) -> list[tuple[float,float]]:
+        """Samples at or after since, oldest first"""
+        first=(self._next-self._size)%self._capacity
+        indexes=[(first+i)%self._capacity for i in range(self._size)]
+        return [(self._times[i],self._values[i]) for i in indexes if self._times[i] >= since]
+
+class RollupTier:
+    """Min/max/mean of the samples in fixed, wall clock aligned intervals, the newest bucket is still being filled"""
+
+    def __init__(self,resolution:int,capacity:int) -> None:
+        self.resolution=resolution
+        self._capacity=capacity
+        self._starts=_zeros("d",capacity)
+        self._mins=_zeros("d",capacity)
+        self._maxs=_zeros("d",capacity)
+        self._sums=_zeros("d",capacity)
+        self._counts=_zeros("L",capacity)
+        self._newest=-1
+        self._size=0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self,timestamp:float,value:float) -> None:
+        start=timestamp-timestamp%self.resolution
+        newest=self._newest
+
+        if self._size and start <= self._starts[newest]:
+            if start < self._starts[newest]:
+                #Clock went backwards, the bucket was already rolled up
+                return
+
+            self._mins[newest]=min(self._mins[newest],value)
+            self._maxs[newest]=max(self._maxs[newest],value)
+            self._sums[newest]+=value
+            self._counts[newest]+=1
+            return
+
+        newest=(newest+1)%self._capacity
+        self._starts[newest]=start
+        self._mins[newest]=value
+        self._maxs[newest]=value
+        self._sums[newest]=value
+        self._counts[newest]=1
+        self._newest=newest
+        self._size=min(self._size+1,self._capacity)
+
+    def _bucket(self,index:int) -> HistoryBucket:
+        count=self._counts[index]
+        return HistoryBucket(self._starts[index],self._mins[index],self._maxs[index],self._sums[index]/count,count)
+
+    def buckets(self,since:float=0.0) -> list[HistoryBucket]:
+        """Buckets ending after since, oldest first"""
+        first=(self._newest-self._size+1)%self._capacity
+        indexes=[(first+i)%self._capacity for i in range(self._size)]
+        return [self._bucket(i) for i in indexes if self._starts[i]+self.resolution > since]
+
+    def lastCompleted(self,now:float) -> HistoryBucket|None:
+        """The newest bucket whose interval has ended by now"""
+        if not self._size:
+            return None
+
+        if self._starts[self._newest]+self.resolution <= now:
+            return self._bucket(self._newest)
+
+        if self._size > 1:
+            return self._bucket((self._newest-1)%self._capacity)
+
+        return None
+
+class MetricHistory:
+    """Raw samples at poll resolution plus their roll-up tiers for one field"""
+
+    def __init__(self,rawSamples:int=HISTORY_RAW_SAMPLES,tiers:dict[str,tuple[int,int]]=HISTORY_TIERS) -> None:
+        self.raw=SampleRing(rawSamples)
+        self.tiers={name:RollupTier(resolution,capacity) for name,(resolution,capacity) in tiers.items()}
+
+    def add(self,timestamp:float,value:float) -> None:
+        self.raw.append(timestamp,value)
+        for tier in self.tiers.values():
+            tier.add(timestamp,value)
+
+class SystemDataHistory:
+    """In memory time series of the fast changing fields of one logger"""
+
+    def __init__(self,rawSamples:int=HISTORY_RAW_SAMPLES,tiers:dict[str,tuple[int,int]]=HISTORY_TIERS) -> None:
+        self._fields=HISTORY_FIELDS
+        self.metrics={field:MetricHistory(rawSamples,tiers) for _,field in self._fields}
+
+    def record(self,systemData:SystemData,timestamp:float,dataSources:set[str]) -> None:
+        """Add the fields of the data sources read by a poll, offline placeholders are not samples and are skipped"""
+        if not systemData.wifi_logger.online_status:
+            return
+
+        for dataSource,field in self._fields:
+            #The other data sources carry the values of an earlier poll
+            if dataSource not in dataSources:
+                continue
+
+            value=getattr(getattr(systemData,dataSource),field)
+            if value is not None:
+                self.metrics[field].add(timestamp,float(value))
+
+    def lastCompleted(self,field:str,tier:str,now:float) -> HistoryBucket|None:
+        return self.metrics[field].tiers[tier].lastCompleted(now)
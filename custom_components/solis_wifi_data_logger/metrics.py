@@ -0,0 +1,132 @@
+from bisect import bisect_left
+from datetime import datetime,timezone
+import time
+from typing import Any
+
+from .const import METRICS_LATENCY_BUCKETS,METRICS_PARSE_BUCKETS
+
+class Histogram:
+    """Observation counts per upper bound, seconds, the last bucket catches everything above"""
+
+    __slots__=("_bounds","_counts","count","sum")
+
+    def __init__(self,bounds:tuple[float,...]) -> None:
+        self._bounds=bounds
+        self._counts=[0]*(len(bounds)+1)
+        self.count=0
+        self.sum=0.0
+
+    def observe(self,value:float) -> None:
+        self._counts[bisect_left(self._bounds,value)]+=1
+        self.count+=1
+        self.sum+=value
+
+    def quantile(self,q:float) -> float|None:
+        """Upper bound of the bucket holding the q quantile, None before the first observation"""
+        if not self.count:
+            return None
+
+        rank=q*self.count
+        cumulative=0
+        for bound,count in zip(self._bounds,self._counts):
+            cumulative+=count
+            if cumulative >= rank:
+                return bound
+
+        return self._bounds[-1]
+
+    def toDict(self) -> dict[str,Any]:
+        #Cumulative like a Prometheus histogram
+        buckets={}
+        cumulative=0
+        for bound,count in zip(self._bounds+(float("inf"),),self._counts):
+            cumulative+=count
+            buckets[f"{bound:g}"]=cumulative
+
+        return {"buckets":buckets,"count":self.count,"sum":round(self.sum,6)}
+
+class EndpointMetrics:
+    """Request latency, parse time, payload size and errors of one CGI endpoint"""
+
+    __slots__=("latency","parseTime","bytesReceived","responses","errors")
+
+    def __init__(self) -> None:
+        self.latency=Histogram(METRICS_LATENCY_BUCKETS)
+        self.parseTime=Histogram(METRICS_PARSE_BUCKETS)
+        self.bytesReceived=0
+        self.responses=0
+        self.errors:dict[str,int]={}
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "latency":self.latency.toDict(),
+            "parse_time":self.parseTime.toDict(),
+            "bytes_received":self.bytesReceived,
+            "responses":self.responses,
+            "errors":dict(self.errors)
+        }
+
+class PollMetrics:
+    """Counters of one logger's polls, recorded by SolisWifiApi per request and by the coordinator per poll"""
+
+    def __init__(self) -> None:
+        self.endpoints:dict[str,EndpointMetrics]={}
+        self.pollDuration=Histogram(METRICS_LATENCY_BUCKETS)
+        self.lastPollDuration:float|None=None
+        self.polls=0
+        self.pollErrors:dict[str,int]={}
+        self.lastSuccess:datetime|None=None
+        self._lastSuccessMonotonic:float|None=None
+
+    def endpoint(self,dataSource:str) -> EndpointMetrics:
+        endpoint=self.endpoints.get(dataSource)
+        if endpoint is None:
+            endpoint=self.endpoints[dataSource]=EndpointMetrics()
+        return endpoint
+
+    def recordResponse(self,dataSource:str,latency:float,size:int,parseTime:float) -> None:
+        endpoint=self.endpoint(dataSource)
+        endpoint.latency.observe(latency)
+        endpoint.parseTime.observe(parseTime)
+        endpoint.bytesReceived+=size
+        endpoint.responses+=1
+
+    def recordRequestError(self,dataSource:str,kind:str) -> None:
+        errors=self.endpoint(dataSource).errors
+        errors[kind]=errors.get(kind,0)+1
+
+    def recordPoll(self,duration:float) -> None:
+        self.pollDuration.observe(duration)
+        self.lastPollDuration=duration
+        self.polls+=1
+        self.lastSuccess=datetime.now(timezone.utc)
+        self._lastSuccessMonotonic=time.monotonic()
+
+    def recordPollError(self,kind:str) -> None:
+        self.polls+=1
+        self.pollErrors[kind]=self.pollErrors.get(kind,0)+1
+
+    @property
+    def pollErrorCount(self) -> int:
+        return sum(self.pollErrors.values())
+
+    @property
+    def bytesReceived(self) -> int:
+        return sum(endpoint.bytesReceived for endpoint in self.endpoints.values())
+
+    def secondsSinceLastSuccess(self) -> float|None:
+        if self._lastSuccessMonotonic is None:
+            return None
+        return time.monotonic()-self._lastSuccessMonotonic
+
+    def toDict(self) -> dict[str,Any]:
+        secondsSinceLastSuccess=self.secondsSinceLastSuccess()
+        return {
+            "polls":self.polls,
+            "poll_errors":dict(self.pollErrors),
+            "poll_duration":self.pollDuration.toDict(),
+            "last_poll_duration":self.lastPollDuration,
+            "last_success":self.lastSuccess.isoformat() if self.lastSuccess else None,
+            "seconds_since_last_success":round(secondsSinceLastSuccess,3) if secondsSinceLastSuccess is not None else None,
+            "endpoints":{dataSource:endpoint.toDict() for dataSource,endpoint in self.endpoints.items()}
+        }
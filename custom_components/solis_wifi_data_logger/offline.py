@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from .solis_wifi_api import InverterData,WifiDataLoggerData,SystemData
+
+class OfflineStateEngine:
+    """SystemData published while the logger is unreachable, built once per outage from the last known data in memory"""
+
+    def __init__(self) -> None:
+        self._offlineData:SystemData|None=None
+
+    @property
+    def inOutage(self) -> bool:
+        return self._offlineData is not None
+
+    def offlineData(self,lastKnown:SystemData|None) -> SystemData:
+        """The offline data of the current outage, only the first failed poll builds it"""
+        if self._offlineData is None:
+            self._offlineData=OfflineStateEngine._build(lastKnown)
+
+        return self._offlineData
+
+    def recovered(self) -> None:
+        """The logger answered, the next failure starts a new outage"""
+        self._offlineData=None
+
+    @staticmethod
+    def _build(lastKnown:SystemData|None) -> SystemData:
+        #Identity and addressing of the last known data, telemetry zeroed and states unknown
+        inverter_data = InverterData(
+            lastKnown.inverter.serial_number if lastKnown else "",
+            None,
+            lastKnown.inverter.model if lastKnown else "",
+            0,
+            0,
+            0,
+            None
+        )
+
+        wifi_logger_data=WifiDataLoggerData(
+            False,
+            lastKnown.wifi_logger.last_seen if lastKnown else datetime.min,
+            lastKnown.wifi_logger.serial_number if lastKnown else "",
+            None,
+            None,
+            None,
+            None,
+            0,
+            lastKnown.wifi_logger.ip_address if lastKnown else "",
+            lastKnown.wifi_logger.mac_address if lastKnown else "",
+            None,
+            None
+        )
+
+        return SystemData(inverter_data,wifi_logger_data)
@@ -0,0 +1,37 @@
+from .solis_wifi_api import SystemData
+
+class AdaptivePollInterval:
+    """Backs polling off exponentially while the stick is offline or the inverter idle"""
+
+    def __init__(self,baseInterval:float,maxInterval:float,backoffFactor:float=2.0) -> None:
+        self._baseInterval=baseInterval
+        self._maxInterval=max(baseInterval,maxInterval)
+        self._backoffFactor=backoffFactor
+        self._interval=baseInterval
+        self._wasOnline:bool|None=None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def reset(self) -> None:
+        """Probe at the base interval again, e.g. when the sun rises"""
+        self._interval=self._baseInterval
+
+    def update(self,systemData:SystemData|None,sunBelowHorizon:bool=False) -> float:
+        """Return the interval until the next poll after this poll's result"""
+        online=systemData is not None and systemData.wifi_logger.online_status
+
+        if online and not self._wasOnline:
+            #The stick just came back, probe quickly until it is producing or idles again
+            self._interval=self._baseInterval
+        elif sunBelowHorizon and not online:
+            self._interval=self._maxInterval
+        elif not online or not systemData.inverter.current_power:
+            self._interval=min(self._maxInterval,self._interval*self._backoffFactor)
+        else:
+            self._interval=self._baseInterval
+
+        self._wasOnline=online
+
+        return self._interval
@@ -0,0 +1,28 @@
+"""Prometheus text endpoint for the loggers exporting to Prometheus."""
+from __future__ import annotations
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .exporter import toPrometheusText
+from .const import DOMAIN,EXPORT_TARGET_PROMETHEUS
+
+class SolisPrometheusView(HomeAssistantView):
+    """Latest sample of every logger with the Prometheus export target, scraped with a long-lived access token."""
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass: HomeAssistant = request.app["hass"]
+
+        samples = []
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            coordinator = hass.data[DOMAIN].get(entry.entry_id)
+            if coordinator is not None and coordinator.export_target == EXPORT_TARGET_PROMETHEUS and coordinator.data is not None and not coordinator.is_stale:
+                samples.append(coordinator.data)
+
+        return web.Response(text=toPrometheusText(samples), content_type="text/plain", headers={"X-Content-Type-Options": "nosniff"})
@@ -7,16 +7,18 @@ from .const import (
     ATTR_SERIAL_NUMBER,
     ATTR_FIRMWARE_VERSION,
     ATTR_MAC_ADDRESS,
-    ATTR_MODEL
+    ATTR_MODEL,
+    ATTR_LAST_SEEN
 )
 
 
 @callback
 def exclude_attributes(hass: HomeAssistant) -> set[str]:
-    """Exclude static attributes from being recorded in the database."""
+    """Exclude static attributes, and last_seen which changes on every poll, from being recorded in the database."""
     return {
         ATTR_SERIAL_NUMBER,
         ATTR_FIRMWARE_VERSION,
         ATTR_MAC_ADDRESS,
-        ATTR_MODEL
-    }
\ No newline at end of file
+        ATTR_MODEL,
+        ATTR_LAST_SEEN
+    }
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from .solis_wifi_api import SolisWifiApi
+
+_LOGGER = logging.getLogger(__name__)
+
+class SolisWifiApiScheduler:
+    """Shares one connection pool between all loggers and staggers their polls"""
+
+    def __init__(self,maxConcurrentPolls:int,pollStaggerWindow:float) -> None:
+        self._session:aiohttp.ClientSession|None=None
+        self._pollSemaphore=asyncio.Semaphore(maxConcurrentPolls)
+        self._pollStaggerWindow=pollStaggerWindow
+        self._nextPollStart=0.0
+        self._users:set[str]=set()
+
+    def register(self,key:str) -> aiohttp.ClientSession:
+        """Register a logger and return the shared session"""
+        self._users.add(key)
+
+        if self._session is None or self._session.closed:
+            self._session=SolisWifiApi.createSession()
+
+        return self._session
+
+    async def unregister(self,key:str) -> None:
+        """Unregister a logger, the shared session is closed once the last logger has gone"""
+        self._users.discard(key)
+
+        if not self._users and self._session is not None:
+            session=self._session
+            self._session=None
+            await session.close()
+
+    @asynccontextmanager
+    async def pollSlot(self):
+        """Wait for a free, staggered slot so loggers never all poll in the same event loop tick"""
+        loop=asyncio.get_running_loop()
+        now=loop.time()
+
+        #Polls due together are spread evenly over the stagger window
+        start=max(now,self._nextPollStart)
+        self._nextPollStart=start+self._pollStaggerWindow/max(1,len(self._users))
+
+        if start > now:
+            await asyncio.sleep(start-now)
+
+        async with self._pollSemaphore:
+            yield
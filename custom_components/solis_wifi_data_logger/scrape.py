@@ -0,0 +1,145 @@
+"""Poll many Solis Wifi Data Loggers once from the command line, without a running Home Assistant.
+
+Every host is polled concurrently, bounded by --concurrency, on one shared
+keep-alive connection pool. Results are streamed as they complete, one NDJSON
+object or CSV row per host, to stdout or --output.
+
+    python -m custom_components.solis_wifi_data_logger.scrape --hosts-file sticks.txt --format csv --output audit.csv
+
+Hosts are given as arguments or one per line in --hosts-file ("-" reads
+stdin), as a URL or a bare host name or address. --capture also appends every
+raw response to a capture file, see capture.py.
+
+It is run as part of the integration package, whose __init__ imports
+homeassistant, so Home Assistant has to be installed in the environment.
+"""
+import argparse
+import asyncio
+import csv
+import dataclasses
+import json
+import sys
+import time
+from typing import Any,IO
+
+import aiohttp
+
+from .solis_wifi_api import SolisWifiApi,InverterData,WifiDataLoggerData
+from .capture import CaptureWriter
+from .const import DEFAULT_USERNAME,CONNECTION_LIMIT_PER_HOST,CONNECTION_KEEPALIVE_TIMEOUT,DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER
+
+DEFAULT_CONCURRENCY=64
+DEFAULT_TIMEOUT=20
+
+CSV_COLUMNS=["host","ok","error","elapsed_ms"]+[
+    f"{dataSource}.{field.name}"
+    for dataSource,dataClass in ((DATA_SOURCE_INVERTER,InverterData),(DATA_SOURCE_WIFI_LOGGER,WifiDataLoggerData))
+    for field in dataclasses.fields(dataClass)
+]
+
+def normalizeHost(host:str) -> str:
+    host=host.strip()
+    return host if "://" in host else f"http://{host}"
+
+def readHosts(hosts:list[str],hostsFile:str|None) -> list[str]:
+    lines=list(hosts)
+
+    if hostsFile == "-":
+        lines.extend(sys.stdin)
+    elif hostsFile:
+        with open(hostsFile,encoding="utf-8") as f:
+            lines.extend(f)
+
+    #Keep the order, drop blanks, comments and duplicates
+    return list(dict.fromkeys(normalizeHost(line) for line in lines if line.strip() and not line.lstrip().startswith("#")))
+
+async def pollHost(host:str,username:str,password:str,session:aiohttp.ClientSession,semaphore:asyncio.Semaphore,timeout:float,capture:CaptureWriter|None=None) -> dict[str,Any]:
+    async with semaphore:
+        api=SolisWifiApi(host,username,password,session=session,capture=capture)
+        start=time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                systemData=await api.getSystemData()
+        except Exception as e:
+            return {"host":host,"ok":False,"error":f"{type(e).__name__}: {e}".rstrip(": "),"elapsed_ms":round((time.perf_counter()-start)*1000,1)}
+
+        result={"host":host,"ok":True,"error":None,"elapsed_ms":round((time.perf_counter()-start)*1000,1)}
+        result.update(systemData.to_dict())
+        return result
+
+class ResultWriter:
+    """Streams poll results as NDJSON lines or CSV rows"""
+
+    def __init__(self,output:IO[str],format:str) -> None:
+        self._output=output
+        self._csv=None
+
+        if format == "csv":
+            self._csv=csv.DictWriter(output,fieldnames=CSV_COLUMNS,extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self,result:dict[str,Any]) -> None:
+        if self._csv is None:
+            self._output.write(json.dumps(result,separators=(",",":"))+"\n")
+        else:
+            row={key:value for key,value in result.items() if not isinstance(value,dict)}
+            for dataSource in (DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER):
+                for name,value in result.get(dataSource,{}).items():
+                    row[f"{dataSource}.{name}"]=value
+            self._csv.writerow(row)
+
+        self._output.flush()
+
+async def scrape(hosts:list[str],username:str,password:str,writer:ResultWriter,concurrency:int=DEFAULT_CONCURRENCY,timeout:float=DEFAULT_TIMEOUT,capturePath:str|None=None) -> tuple[int,int]:
+    """Poll every host once, returns the number of hosts polled and failed"""
+    semaphore=asyncio.Semaphore(max(1,concurrency))
+    connector=aiohttp.TCPConnector(
+        limit=max(1,concurrency)*CONNECTION_LIMIT_PER_HOST,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT
+    )
+
+    capture=CaptureWriter(capturePath) if capturePath else None
+
+    failed=0
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for completed in asyncio.as_completed([pollHost(host,username,password,session,semaphore,timeout,capture) for host in hosts]):
+            result=await completed
+            failed+=not result["ok"]
+            writer.write(result)
+
+    if capture is not None:
+        await capture.close()
+
+    return len(hosts),failed
+
+def main(argv:list[str]|None=None) -> int:
+    parser=argparse.ArgumentParser(description="Poll Solis Wifi Data Loggers and stream the results as NDJSON or CSV")
+    parser.add_argument("hosts",nargs="*",help="Logger URLs or host names")
+    parser.add_argument("--hosts-file",help="File with one host per line, - for stdin")
+    parser.add_argument("--username",default=DEFAULT_USERNAME)
+    parser.add_argument("--password",default="")
+    parser.add_argument("--concurrency",type=int,default=DEFAULT_CONCURRENCY,help="Loggers polled at the same time")
+    parser.add_argument("--timeout",type=float,default=DEFAULT_TIMEOUT,help="Seconds allowed per logger")
+    parser.add_argument("--format",choices=["ndjson","csv"],default="ndjson")
+    parser.add_argument("--output",help="Output file, stdout by default")
+    parser.add_argument("--capture",help="Also append the raw responses to this capture file")
+    args=parser.parse_args(argv)
+
+    hosts=readHosts(args.hosts,args.hosts_file)
+    if not hosts:
+        parser.error("no hosts given")
+
+    output=open(args.output,"w",encoding="utf-8",newline="") if args.output else sys.stdout
+    try:
+        start=time.perf_counter()
+        polled,failed=asyncio.run(scrape(hosts,args.username,args.password,ResultWriter(output,args.format),args.concurrency,args.timeout,args.capture))
+        print(f"Polled {polled} loggers in {time.perf_counter()-start:.1f}s, {failed} failed",file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
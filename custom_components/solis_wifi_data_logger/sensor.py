@@ -1,9 +1,14 @@
 
 import logging
-from typing import Type
+import time
+import dataclasses
+from collections.abc import Callable
+from typing import Any
+from dataclasses import dataclass
+from datetime import datetime
 from .solis_wifi_api import SystemData
 
-from homeassistant.components.sensor import SensorEntity,StateType,SensorStateClass
+from homeassistant.components.sensor import SensorEntity,SensorEntityDescription,SensorDeviceClass,SensorStateClass,StateType,RestoreSensor,SensorExtraStoredData
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity
@@ -11,83 +16,323 @@ from homeassistant.helpers.update_coordinator import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.core import callback
+import homeassistant.util.dt as dt_util
 from .utilities import Utilities
+from .circuit_breaker import CircuitState
 from .data_update_coordinator import SolisWifiApiDataUpdateCoordinator
 
-from .const import DOMAIN,COORDINATOR
+from .const import DOMAIN,DATA_SOURCE_INVERTER,DATA_SOURCE_WIFI_LOGGER,RECORDER_PROFILE_MINIMAL,TRANSPORT_SOLARMAN_V5,STATISTICS_FIELDS
 _LOGGER = logging.getLogger(__name__)
 
+@dataclass
+class SolisSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor exposing one field of a SystemData data source"""
+    data_source:str=DATA_SOURCE_INVERTER
+    value_fn:Callable[[Any],StateType|datetime]|None=None
+
+def _description(dataSource:str,key:str,**kwargs) -> SolisSensorEntityDescription:
+    return SolisSensorEntityDescription(
+        key=key,
+        data_source=dataSource,
+        name=Utilities.FormatSensorName(dataSource,key),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        **kwargs
+    )
+
+#Built once at import, one entry per exposed field
+SENSOR_DESCRIPTIONS:tuple[SolisSensorEntityDescription,...]=(
+    _description(DATA_SOURCE_INVERTER,"temperature",device_class=SensorDeviceClass.TEMPERATURE,icon="mdi:thermometer",native_unit_of_measurement="°C",state_class=SensorStateClass.MEASUREMENT),
+    _description(DATA_SOURCE_INVERTER,"current_power",device_class=SensorDeviceClass.POWER,icon="mdi:solar-power-variant",native_unit_of_measurement="W",state_class=SensorStateClass.MEASUREMENT),
+    _description(DATA_SOURCE_INVERTER,"daily_power_yield",device_class=SensorDeviceClass.ENERGY,icon="mdi:meter-electric",native_unit_of_measurement="kWh",state_class=SensorStateClass.TOTAL_INCREASING),
+    _description(DATA_SOURCE_WIFI_LOGGER,"signal_quality",icon="mdi:signal",native_unit_of_measurement="%",state_class=SensorStateClass.MEASUREMENT),
+)
+
+#Only read by the Solarman V5 transport
+TOTAL_POWER_YIELD_DESCRIPTION=_description(DATA_SOURCE_INVERTER,"total_power_yield",device_class=SensorDeviceClass.ENERGY,icon="mdi:meter-electric",native_unit_of_measurement="kWh",state_class=SensorStateClass.TOTAL_INCREASING)
+
+def _local_timestamp(value:datetime|None) -> datetime|None:
+    #last_seen is naive local time, datetime.min before the logger was ever seen
+    if value is None or value == datetime.min:
+        return None
+    return value.astimezone()
+
+#Attributes of the binary sensors published as sensors by the minimal recorder profile,
+#last_seen changes on every poll so it is disabled by default
+VOLATILE_SENSOR_DESCRIPTIONS:tuple[SolisSensorEntityDescription,...]=(
+    _description(DATA_SOURCE_WIFI_LOGGER,"last_seen",device_class=SensorDeviceClass.TIMESTAMP,icon="mdi:clock-check",value_fn=_local_timestamp,entity_registry_enabled_default=False),
+    _description(DATA_SOURCE_WIFI_LOGGER,"ip_address",icon="mdi:ip-network"),
+    _description(DATA_SOURCE_WIFI_LOGGER,"router_ssid",icon="mdi:wifi"),
+)
+
+@dataclass
+class SolisHistorySensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor exposing a statistic of the last completed interval of a history tier"""
+    data_source:str=DATA_SOURCE_INVERTER
+    field:str=""
+    tier:str="5m"
+    #HistoryBucket attribute, mean, minimum or maximum
+    statistic:str="mean"
+
+def _history_description(dataSource:str,key:str,field:str,tier:str,statistic:str,**kwargs) -> SolisHistorySensorEntityDescription:
+    return SolisHistorySensorEntityDescription(
+        key=key,
+        data_source=dataSource,
+        field=field,
+        tier=tier,
+        statistic=statistic,
+        name=Utilities.FormatSensorName(dataSource,key),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        **kwargs
+    )
+
+#Derived from the in memory history, only written once per interval
+HISTORY_SENSOR_DESCRIPTIONS:tuple[SolisHistorySensorEntityDescription,...]=(
+    _history_description(DATA_SOURCE_INVERTER,"current_power_5_min_mean","current_power","5m","mean",device_class=SensorDeviceClass.POWER,icon="mdi:solar-power-variant",native_unit_of_measurement="W"),
+    _history_description(DATA_SOURCE_INVERTER,"current_power_1_hour_mean","current_power","1h","mean",device_class=SensorDeviceClass.POWER,icon="mdi:solar-power-variant",native_unit_of_measurement="W"),
+    _history_description(DATA_SOURCE_INVERTER,"current_power_1_hour_max","current_power","1h","maximum",device_class=SensorDeviceClass.POWER,icon="mdi:solar-power-variant",native_unit_of_measurement="W"),
+    _history_description(DATA_SOURCE_INVERTER,"temperature_1_hour_max","temperature","1h","maximum",device_class=SensorDeviceClass.TEMPERATURE,icon="mdi:thermometer",native_unit_of_measurement="°C"),
+)
+
+#Today's energy integrated from current_power between daily_power_yield steps, not diagnostic so it can feed the energy dashboard
+ENERGY_SENSOR_DESCRIPTION=SolisSensorEntityDescription(
+    key="daily_energy",
+    data_source=DATA_SOURCE_INVERTER,
+    name=Utilities.FormatSensorName(DATA_SOURCE_INVERTER,"daily_energy"),
+    device_class=SensorDeviceClass.ENERGY,
+    icon="mdi:meter-electric-outline",
+    native_unit_of_measurement="Wh",
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    suggested_display_precision=0
+)
+
+@dataclass
+class SolisMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor exposing one of the poll metrics of a logger"""
+    data_source:str=DATA_SOURCE_WIFI_LOGGER
+    value_fn:Callable[[SolisWifiApiDataUpdateCoordinator],StateType|datetime]=lambda coordinator: None
+
+def _milliseconds(seconds:float|None) -> float|None:
+    return round(seconds*1000,1) if seconds is not None else None
+
+def _metric_description(key:str,value_fn:Callable[[SolisWifiApiDataUpdateCoordinator],StateType|datetime],enabled:bool=False,**kwargs) -> SolisMetricSensorEntityDescription:
+    return SolisMetricSensorEntityDescription(
+        key=key,
+        value_fn=value_fn,
+        name=Utilities.FormatSensorName(DATA_SOURCE_WIFI_LOGGER,key),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=enabled,
+        **kwargs
+    )
+
+#Poll instrumentation, disabled by default except the circuit breaker state
+METRIC_SENSOR_DESCRIPTIONS:tuple[SolisMetricSensorEntityDescription,...]=(
+    _metric_description("poll_duration",lambda coordinator: _milliseconds(coordinator.metrics.lastPollDuration),device_class=SensorDeviceClass.DURATION,icon="mdi:timer-outline",native_unit_of_measurement="ms",state_class=SensorStateClass.MEASUREMENT),
+    _metric_description("poll_duration_p95",lambda coordinator: _milliseconds(coordinator.metrics.pollDuration.quantile(0.95)),device_class=SensorDeviceClass.DURATION,icon="mdi:timer-outline",native_unit_of_measurement="ms",state_class=SensorStateClass.MEASUREMENT),
+    _metric_description("poll_errors",lambda coordinator: coordinator.metrics.pollErrorCount,icon="mdi:alert-circle-outline",state_class=SensorStateClass.TOTAL_INCREASING),
+    _metric_description("bytes_received",lambda coordinator: coordinator.metrics.bytesReceived,device_class=SensorDeviceClass.DATA_SIZE,icon="mdi:download-network-outline",native_unit_of_measurement="B",state_class=SensorStateClass.TOTAL_INCREASING),
+    _metric_description("last_successful_poll",lambda coordinator: coordinator.metrics.lastSuccess,device_class=SensorDeviceClass.TIMESTAMP,icon="mdi:clock-check-outline"),
+    _metric_description("circuit_state",lambda coordinator: coordinator.circuit_breaker.state.value,enabled=True,device_class=SensorDeviceClass.ENUM,options=[state.value for state in CircuitState],icon="mdi:electric-switch"),
+)
+
 async def async_setup_entry(hass, entry:ConfigEntry, async_add_entities):
 
-    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][COORDINATOR]
+    coordinator: SolisWifiApiDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     systemdata:SystemData = coordinator.data
+    deviceInfos = {}
+
     sensors = []
+    for description in SENSOR_DESCRIPTIONS:
+        if description.data_source not in deviceInfos:
+            deviceInfos[description.data_source] = Utilities.GenerateDeviceInfo(systemdata,description.data_source)
+        if coordinator.statistics is not None and description.key in STATISTICS_FIELDS:
+            #Written as external statistics by the coordinator, the recorder need not compile them from the states
+            description = dataclasses.replace(description,state_class=None)
+        sensors.append(SolisApiSensor(coordinator,description,deviceInfos[description.data_source]))
+
+    if coordinator.transport == TRANSPORT_SOLARMAN_V5:
+        sensors.append(SolisApiSensor(coordinator,TOTAL_POWER_YIELD_DESCRIPTION,deviceInfos[DATA_SOURCE_INVERTER]))
+
+    if coordinator.recorder_profile == RECORDER_PROFILE_MINIMAL:
+        for description in VOLATILE_SENSOR_DESCRIPTIONS:
+            if description.data_source not in deviceInfos:
+                deviceInfos[description.data_source] = Utilities.GenerateDeviceInfo(systemdata,description.data_source)
+            sensors.append(SolisApiSensor(coordinator,description,deviceInfos[description.data_source]))
+
+    for description in HISTORY_SENSOR_DESCRIPTIONS:
+        if description.data_source not in deviceInfos:
+            deviceInfos[description.data_source] = Utilities.GenerateDeviceInfo(systemdata,description.data_source)
+        sensors.append(SolisApiHistorySensor(coordinator,description,deviceInfos[description.data_source]))
 
-    filteredSystemData = { k:v for (k,v) in systemdata.__dict__.items()}
-    for dataSource, value in filteredSystemData.items():
-        propertyNames=[a for a in dir(value) if not a.startswith('__') and not callable(getattr(value, a))]
-        for propertyName in propertyNames:
-            deviceInfo = Utilities.GenerateDeviceInfo(systemdata,dataSource)
-            sensor=SolisApiSensor.factory(coordinator,dataSource,propertyName,deviceInfo)
-            if(sensor):
-                sensors.append(sensor)
+    for description in METRIC_SENSOR_DESCRIPTIONS:
+        sensors.append(SolisApiMetricSensor(coordinator,description,deviceInfos[description.data_source]))
+
+    sensors.append(SolisApiEnergySensor(coordinator,ENERGY_SENSOR_DESCRIPTION,deviceInfos[DATA_SOURCE_INVERTER]))
 
     async_add_entities(sensors)
 
 class SolisApiSensor(CoordinatorEntity[SolisWifiApiDataUpdateCoordinator],SensorEntity):
 
-    @staticmethod
-    def factory(coordinator: SolisWifiApiDataUpdateCoordinator,dataSource:str,propertyName:str,deviceInfo:DeviceInfo):
-
-        mapping = {
-            "inverter" : {
-               "temperature" : [Type[float],"temperature","mdi:thermometer",EntityCategory.DIAGNOSTIC,"°C",SensorStateClass.MEASUREMENT],
-               "current_power" : [Type[float],"power","mdi:solar-power-variant",EntityCategory.DIAGNOSTIC,"W",SensorStateClass.MEASUREMENT],
-               "daily_power_yield" : [Type[float],"energy","mdi:meter-electric",EntityCategory.DIAGNOSTIC,"kWh",SensorStateClass.TOTAL_INCREASING]
-            },
-            "wifi_logger" : {
-               "signal_quality" : [Type[float],None,"mdi:signal",EntityCategory.DIAGNOSTIC,"%",SensorStateClass.MEASUREMENT],
-            }
-        }
-        if mapping.get(dataSource) and mapping[dataSource].get(propertyName):
-           configuration=mapping[dataSource][propertyName]
-        
-        else:
-            return None
-        
-        return SolisApiSensor(coordinator,dataSource,propertyName,configuration[0],configuration[1],configuration[2],configuration[3],configuration[4],configuration[5],deviceInfo)
-
-    def __init__(self, coordinator: SolisWifiApiDataUpdateCoordinator,dataSource:str,propertyName:str,stateType:StateType,deviceClass:str,icon:str,entityCategory:EntityCategory,native_unit_of_measurement:str, stateClass:SensorStateClass,deviceInfo:DeviceInfo) -> None:
+    entity_description: SolisSensorEntityDescription
+
+    def __init__(self, coordinator: SolisWifiApiDataUpdateCoordinator,description:SolisSensorEntityDescription,deviceInfo:DeviceInfo) -> None:
         super().__init__(coordinator)
 
-        self._dataSource=dataSource
-        self._propertyName=propertyName
-        self._attr_state=stateType
-        self._attr_device_class=deviceClass
-        self._attr_icon=icon
-        self._attr_state_class=stateClass
-        self._attr_entity_category=entityCategory
-        self._attr_native_unit_of_measurement=native_unit_of_measurement
+        self.entity_description=description
+        self._dataSource=description.data_source
+        self._propertyName=description.key
         self._attr_should_poll=False
 
-        self._attr_name=Utilities.FormatSensorName(dataSource,propertyName)
         self._attr_device_info=deviceInfo
-        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,self._attr_name)
+        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,description.name)
 
         #Set Initial Value
-        self._attr_native_value=getattr(self._data(),self._propertyName)
+        self._attr_native_value=self._value()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value=getattr(self._data(),self._propertyName)
+        if not self.coordinator.has_changed(self._dataSource,[self._propertyName]):
+            return
+
+        self._attr_native_value=self._value()
         self.async_write_ha_state()
 
+    def _value(self) -> StateType|datetime:
+        value=getattr(self._data(),self._propertyName)
+        if self.entity_description.value_fn is not None:
+            return self.entity_description.value_fn(value)
+        return value
+
     def _data(self)->SystemData | None:
-        return getattr(self.coordinator.data,self._dataSource,None)    
+        return getattr(self.coordinator.data,self._dataSource,None)
+
+    @property
+    def available(self) -> bool:
+        return not self.coordinator.is_stale and self._data() is not None and getattr(self._data(),self._propertyName,None) is not None
+
+class SolisApiHistorySensor(CoordinatorEntity[SolisWifiApiDataUpdateCoordinator],SensorEntity):
+
+    entity_description: SolisHistorySensorEntityDescription
+
+    def __init__(self, coordinator: SolisWifiApiDataUpdateCoordinator,description:SolisHistorySensorEntityDescription,deviceInfo:DeviceInfo) -> None:
+        super().__init__(coordinator)
+
+        self.entity_description=description
+        self._attr_should_poll=False
+
+        self._attr_device_info=deviceInfo
+        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,description.name)
+
+        self._bucketStart:float|None=None
+        self._updateValue()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self._updateValue():
+            self.async_write_ha_state()
+
+    def _updateValue(self) -> bool:
+        """Take the statistic of the last completed interval, returns whether it changed"""
+        description=self.entity_description
+        bucket=self.coordinator.history.lastCompleted(description.field,description.tier,time.time())
+        start=bucket.start if bucket else None
+
+        if start == self._bucketStart:
+            return False
+
+        self._bucketStart=start
+        self._attr_native_value=getattr(bucket,description.statistic) if bucket else None
+        return True
+
+    @property
+    def available(self) -> bool:
+        return self._attr_native_value is not None
+
+@dataclass
+class SolisEnergyExtraStoredData(SensorExtraStoredData):
+    """Energy sensor value with the integrator state it was published from"""
+    integrator:dict[str,Any]
+
+    def as_dict(self) -> dict[str,Any]:
+        return {**super().as_dict(),"integrator":self.integrator}
+
+class SolisApiEnergySensor(CoordinatorEntity[SolisWifiApiDataUpdateCoordinator],RestoreSensor):
+
+    entity_description: SolisSensorEntityDescription
+
+    def __init__(self, coordinator: SolisWifiApiDataUpdateCoordinator,description:SolisSensorEntityDescription,deviceInfo:DeviceInfo) -> None:
+        super().__init__(coordinator)
+
+        self.entity_description=description
+        self._attr_should_poll=False
+
+        self._attr_device_info=deviceInfo
+        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,description.name)
+
+        self._attr_native_value=coordinator.energy.energy
+        self._was_available=self.available
+
+    async def async_added_to_hass(self) -> None:
+        """Continue today's energy from the state Home Assistant saved, so a restart or reload never lowers it."""
+        await super().async_added_to_hass()
+
+        if (last_extra_data := await self.async_get_last_extra_data()) is None:
+            return
+
+        integrator=last_extra_data.as_dict().get("integrator")
+        if isinstance(integrator,dict):
+            self.coordinator.energy.restore(integrator,dt_util.now().date().toordinal())
+            self._attr_native_value=self.coordinator.energy.energy
+
+    @property
+    def extra_restore_state_data(self) -> SolisEnergyExtraStoredData:
+        return SolisEnergyExtraStoredData(self.native_value,self.native_unit_of_measurement,self.coordinator.energy.toDict())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        #Restored energy is often unchanged by the first poll, which still makes the sensor available
+        if self.coordinator.energy.energy == self._attr_native_value and self.available == self._was_available:
+            return
+
+        self._attr_native_value=self.coordinator.energy.energy
+        self._was_available=self.available
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        return not self.coordinator.is_stale and self._attr_native_value is not None
+
+class SolisApiMetricSensor(CoordinatorEntity[SolisWifiApiDataUpdateCoordinator],SensorEntity):
+
+    entity_description: SolisMetricSensorEntityDescription
+
+    def __init__(self, coordinator: SolisWifiApiDataUpdateCoordinator,description:SolisMetricSensorEntityDescription,deviceInfo:DeviceInfo) -> None:
+        super().__init__(coordinator)
+
+        self.entity_description=description
+        self._attr_should_poll=False
+
+        self._attr_device_info=deviceInfo
+        self._attr_unique_id=Utilities.GenerateUniqueId(coordinator,description.name)
+
+        self._attr_native_value=description.value_fn(coordinator)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        value=self.entity_description.value_fn(self.coordinator)
+        if value == self._attr_native_value:
+            return
+
+        self._attr_native_value=value
+        self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
-        return self._data() is not None and getattr(self._data(),self._propertyName,None) is not None
-    
+        #Describes the polling itself, so it stays available when polls fail
+        return True
@@ -0,0 +1,81 @@
+from __future__ import annotations
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant,ServiceCall,ServiceResponse,SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .history import SystemDataHistory
+from .const import (
+    DOMAIN,
+    HISTORY_FIELDS,
+    HISTORY_RAW,
+    HISTORY_TIERS,
+    SERVICE_GET_HISTORY,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_FIELD,
+    ATTR_RESOLUTION,
+    ATTR_SINCE
+)
+
+GET_HISTORY_SCHEMA=vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_FIELD): vol.In([field for _,field in HISTORY_FIELDS]),
+    vol.Optional(ATTR_RESOLUTION,default="5m"): vol.In([HISTORY_RAW,*HISTORY_TIERS]),
+    vol.Optional(ATTR_SINCE): cv.datetime
+})
+
+def async_setup_services(hass:HomeAssistant) -> None:
+    """Register the services of the integration, shared by all loggers."""
+
+    async def async_get_history(call:ServiceCall) -> ServiceResponse:
+        coordinators={
+            entry.entry_id:hass.data[DOMAIN][entry.entry_id]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id in hass.data[DOMAIN]
+        }
+
+        entry_id=call.data.get(ATTR_CONFIG_ENTRY_ID)
+        if entry_id is not None:
+            if entry_id not in coordinators:
+                raise HomeAssistantError(f"No loaded Solis Wifi Data Logger with config entry {entry_id}")
+            coordinators={entry_id:coordinators[entry_id]}
+
+        since=call.data.get(ATTR_SINCE)
+        since_timestamp=dt_util.as_utc(since).timestamp() if since else 0.0
+
+        return {
+            entry_id:_history_response(coordinator.history,call.data[ATTR_FIELD],call.data[ATTR_RESOLUTION],since_timestamp)
+            for entry_id,coordinator in coordinators.items()
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY
+    )
+
+def _history_response(history:SystemDataHistory,field:str,resolution:str,since:float) -> list[dict[str,Any]]:
+    metric=history.metrics[field]
+
+    if resolution == HISTORY_RAW:
+        return [
+            {"time":dt_util.utc_from_timestamp(timestamp).isoformat(),"value":value}
+            for timestamp,value in metric.raw.samples(since)
+        ]
+
+    return [
+        {
+            "start":dt_util.utc_from_timestamp(bucket.start).isoformat(),
+            "min":bucket.minimum,
+            "max":bucket.maximum,
+            "mean":round(bucket.mean,3),
+            "count":bucket.count
+        }
+        for bucket in metric.tiers[resolution].buckets(since)
+    ]
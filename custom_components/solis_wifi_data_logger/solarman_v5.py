@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import struct
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .solis_wifi_api import SolisWifiApi,InverterData,SolisWifiApiParseException
+from .const import CONNECT_TIMEOUT,READ_TIMEOUT,SOLARMAN_V5_PORT,SOLARMAN_V5_SLAVE_ID
+
+_LOGGER = logging.getLogger(__name__)
+
+#Solarman V5 frame: start, payload length, control code, sequence, logger serial, payload, checksum, end
+V5_START=0xA5
+V5_END=0x15
+V5_HEADER=struct.Struct("<BHHHI")
+V5_CONTROL_REQUEST=0x4510
+V5_CONTROL_RESPONSE=0x1510
+#Request payload: frame type, sensor type, total working, power on and offset times, then the Modbus RTU frame
+V5_REQUEST_PAYLOAD=struct.Struct("<BHIII")
+V5_FRAME_TYPE_INVERTER=0x02
+#Response payload: frame type, status, total working, power on and offset times, then the Modbus RTU frame
+V5_RESPONSE_PAYLOAD_SIZE=14
+
+#PollMetrics endpoint of the V5 requests
+SOLARMAN_V5_ENDPOINT="solarman_v5"
+
+MODBUS_READ_INPUT_REGISTERS=0x04
+MODBUS_MAX_REGISTERS=125
+
+def _crcTable() -> tuple[int,...]:
+    table=[]
+    for byte in range(256):
+        crc=byte
+        for _ in range(8):
+            crc=(crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+_CRC_TABLE=_crcTable()
+
+def modbusCrc(data:bytes) -> int:
+    """CRC-16/MODBUS of a RTU frame, sent little endian after it"""
+    crc=0xFFFF
+    for byte in data:
+        crc=(crc >> 8) ^ _CRC_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+def encodeReadInputRegisters(slaveId:int,start:int,count:int) -> bytes:
+    frame=struct.pack(">BBHH",slaveId,MODBUS_READ_INPUT_REGISTERS,start,count)
+    return frame+struct.pack("<H",modbusCrc(frame))
+
+def decodeReadInputRegisters(frame:bytes,slaveId:int,count:int) -> tuple[int,...]:
+    """Registers of a read input registers response, raises SolarmanV5FrameError when it does not match the request"""
+    if len(frame) < 5 or modbusCrc(frame[:-2]) != int.from_bytes(frame[-2:],"little"):
+        raise SolarmanV5FrameError("Modbus response CRC mismatch")
+
+    if frame[0] != slaveId:
+        raise SolarmanV5FrameError(f"Modbus response from slave {frame[0]}, expected {slaveId}")
+
+    if frame[1] == MODBUS_READ_INPUT_REGISTERS | 0x80:
+        raise SolarmanV5FrameError(f"Modbus exception code {frame[2]}")
+
+    if frame[1] != MODBUS_READ_INPUT_REGISTERS or frame[2] != count*2 or len(frame) != count*2+5:
+        raise SolarmanV5FrameError(f"Unexpected Modbus response for {count} registers")
+
+    return struct.unpack_from(f">{count}H",frame,3)
+
+def encodeV5Frame(loggerSerial:int,sequence:int,modbusFrame:bytes) -> bytes:
+    payload=V5_REQUEST_PAYLOAD.pack(V5_FRAME_TYPE_INVERTER,0,0,0,0)+modbusFrame
+    frame=V5_HEADER.pack(V5_START,len(payload),V5_CONTROL_REQUEST,sequence,loggerSerial)+payload
+    #The checksum covers everything after the start byte
+    return frame+bytes((sum(frame[1:]) & 0xFF,V5_END))
+
+def decodeV5Frame(frame:bytes,loggerSerial:int) -> bytes:
+    """Modbus RTU frame carried by a V5 response, raises SolarmanV5FrameError on a corrupt frame"""
+    if len(frame) < V5_HEADER.size+2 or frame[0] != V5_START or frame[-1] != V5_END:
+        raise SolarmanV5FrameError("Not a Solarman V5 frame")
+
+    if sum(frame[1:-2]) & 0xFF != frame[-2]:
+        raise SolarmanV5FrameError("Solarman V5 checksum mismatch")
+
+    _,length,control,_,serial=V5_HEADER.unpack_from(frame)
+    if serial != loggerSerial:
+        raise SolarmanV5FrameError(f"Solarman V5 response from logger {serial}, expected {loggerSerial}")
+
+    payload=frame[V5_HEADER.size:-2]
+    if len(payload) != length or control != V5_CONTROL_RESPONSE or len(payload) <= V5_RESPONSE_PAYLOAD_SIZE:
+        #The stick answers without a Modbus frame when the inverter did not respond
+        raise SolarmanV5FrameError("Solarman V5 response carries no Modbus frame")
+
+    return payload[V5_RESPONSE_PAYLOAD_SIZE:]
+
+class SolarmanV5Client:
+    """Persistent TCP connection to the stick's Solarman V5 port, requests are sent one at a time"""
+
+    def __init__(self,host:str,loggerSerial:int,port:int=SOLARMAN_V5_PORT,slaveId:int=SOLARMAN_V5_SLAVE_ID,connectTimeout:float=CONNECT_TIMEOUT,readTimeout:float=READ_TIMEOUT) -> None:
+        self._host=host
+        self._port=port
+        self._loggerSerial=loggerSerial
+        self._slaveId=slaveId
+        self._connectTimeout=connectTimeout
+        self._readTimeout=readTimeout
+
+        self._reader:asyncio.StreamReader|None=None
+        self._writer:asyncio.StreamWriter|None=None
+        self._lock=asyncio.Lock()
+        self._sequence=0
+
+        #Bytes of the V5 frames of the last readInputRegisters call
+        self.lastResponseSize=0
+
+    async def readInputRegisters(self,start:int,count:int) -> list[int]:
+        """Read a contiguous block of input registers, in as few Modbus requests as the register limit allows"""
+        registers=[]
+        self.lastResponseSize=0
+
+        async with self._lock:
+            for blockStart in range(start,start+count,MODBUS_MAX_REGISTERS):
+                blockCount=min(MODBUS_MAX_REGISTERS,start+count-blockStart)
+                modbusFrame=await self._request(encodeReadInputRegisters(self._slaveId,blockStart,blockCount))
+                registers.extend(decodeReadInputRegisters(modbusFrame,self._slaveId,blockCount))
+
+        return registers
+
+    async def _request(self,modbusFrame:bytes) -> bytes:
+        reused=self._writer is not None
+        try:
+            return await self._exchange(modbusFrame)
+        except (ConnectionResetError,BrokenPipeError,asyncio.IncompleteReadError) as e:
+            await self._disconnect()
+            if not reused:
+                raise SolarmanV5ConnectionException(f"Solarman V5 request to {self._host}:{self._port} failed: {e!r}") from e
+        except (OSError,asyncio.TimeoutError) as e:
+            await self._disconnect()
+            raise SolarmanV5ConnectionException(f"Solarman V5 request to {self._host}:{self._port} failed: {e!r}") from e
+        except SolarmanV5FrameError:
+            #The stream cannot be trusted to be in step any more
+            await self._disconnect()
+            raise
+
+        #The stick drops idle connections, retry once on a fresh one
+        _LOGGER.debug(f"Solarman V5 connection to {self._host}:{self._port} closed by logger, reconnecting")
+        try:
+            return await self._exchange(modbusFrame)
+        except (OSError,asyncio.IncompleteReadError,asyncio.TimeoutError) as e:
+            await self._disconnect()
+            raise SolarmanV5ConnectionException(f"Solarman V5 request to {self._host}:{self._port} failed: {e!r}") from e
+        except SolarmanV5FrameError:
+            await self._disconnect()
+            raise
+
+    async def _exchange(self,modbusFrame:bytes) -> bytes:
+        if self._writer is None:
+            self._reader,self._writer=await asyncio.wait_for(asyncio.open_connection(self._host,self._port),self._connectTimeout)
+
+        self._sequence=self._sequence % 0xFF+1
+        self._writer.write(encodeV5Frame(self._loggerSerial,self._sequence,modbusFrame))
+        await self._writer.drain()
+
+        async with asyncio.timeout(self._readTimeout):
+            while True:
+                header=await self._reader.readexactly(V5_HEADER.size)
+                if header[0] != V5_START:
+                    raise SolarmanV5FrameError("Not a Solarman V5 frame")
+                frame=header+await self._reader.readexactly(int.from_bytes(header[1:3],"little")+2)
+                self.lastResponseSize+=len(frame)
+
+                #Only the low byte of the sequence is echoed, anything else is a late answer or a frame sent by the stick itself
+                control=int.from_bytes(header[3:5],"little")
+                if control == V5_CONTROL_RESPONSE and header[5] == self._sequence:
+                    return decodeV5Frame(frame,self._loggerSerial)
+
+                _LOGGER.debug(f"Skipping Solarman V5 frame with control code {control:#06x}")
+
+    async def _disconnect(self) -> None:
+        writer=self._writer
+        self._reader=None
+        self._writer=None
+
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+#Solis input registers, read as one block from INVERTER_REGISTERS_START
+INVERTER_REGISTERS_START=33000
+INVERTER_REGISTERS_COUNT=121
+REGISTER_MODEL=33000
+REGISTER_FIRMWARE_VERSION=33001
+REGISTER_SERIAL_NUMBER=33004
+SERIAL_NUMBER_REGISTERS=16
+REGISTER_TOTAL_POWER_YIELD=33029
+REGISTER_DAILY_POWER_YIELD=33035
+REGISTER_CURRENT_POWER=33079
+REGISTER_TEMPERATURE=33093
+REGISTER_FAULT_CODES=33116
+FAULT_CODE_REGISTERS=5
+
+def decodeInverterRegisters(registers:list[int],start:int=INVERTER_REGISTERS_START) -> dict:
+    """InverterData fields from the Solis input register block"""
+    def register(address:int) -> int:
+        return registers[address-start]
+
+    def doubleRegister(address:int) -> int:
+        return register(address) << 16 | register(address+1)
+
+    def signed(value:int,bits:int) -> int:
+        return value-(1 << bits) if value & (1 << (bits-1)) else value
+
+    if len(registers) < INVERTER_REGISTERS_COUNT:
+        raise ValueError(f"Expected {INVERTER_REGISTERS_COUNT} registers, got {len(registers)}")
+
+    #Two ASCII characters per register, padded with NUL or spaces
+    serialNumber=struct.pack(f">{SERIAL_NUMBER_REGISTERS}H",*registers[REGISTER_SERIAL_NUMBER-start:REGISTER_SERIAL_NUMBER-start+SERIAL_NUMBER_REGISTERS])
+
+    return {
+        "serial_number":serialNumber.replace(b"\x00",b"").decode("ascii",errors="replace").strip(),
+        "firmware_version":f"{register(REGISTER_FIRMWARE_VERSION):04X}",
+        "model":f"{register(REGISTER_MODEL):X}",
+        "temperature":signed(register(REGISTER_TEMPERATURE),16)/10,
+        "current_power":float(signed(doubleRegister(REGISTER_CURRENT_POWER),32)),
+        "daily_power_yield":register(REGISTER_DAILY_POWER_YIELD)/10,
+        "alerts":any(registers[REGISTER_FAULT_CODES-start:REGISTER_FAULT_CODES-start+FAULT_CODE_REGISTERS]),
+        "total_power_yield":float(doubleRegister(REGISTER_TOTAL_POWER_YIELD))
+    }
+
+class SolarmanV5Api(SolisWifiApi):
+    """Reads the inverter over Solarman V5 in one register block, the logger's own data still comes from moniter.cgi"""
+
+    def __init__(self,hostname:str,username:str,password:str,loggerSerial:int,port:int=SOLARMAN_V5_PORT,**kwargs) -> None:
+        super().__init__(hostname,username,password,**kwargs)
+
+        host=urlsplit(hostname if "://" in hostname else f"http://{hostname}").hostname or hostname
+        self._client=SolarmanV5Client(host,loggerSerial,port)
+
+    async def getInverterData(self) -> InverterData:
+        self._checkCircuit(SOLARMAN_V5_ENDPOINT,"Inverter")
+
+        start=time.perf_counter()
+        try:
+            registers=await self._client.readInputRegisters(INVERTER_REGISTERS_START,INVERTER_REGISTERS_COUNT)
+        except SolarmanV5ConnectionException:
+            self._recordRequestError(SOLARMAN_V5_ENDPOINT,"connection")
+            raise
+        except SolarmanV5FrameError as e:
+            self._recordRequestError(SOLARMAN_V5_ENDPOINT,"parse")
+            raise SolisWifiApiParseException(f"Could not parse Solarman V5 inverter data: {e}") from e
+
+        parseStart=time.perf_counter()
+        try:
+            inverterData=InverterData(**decodeInverterRegisters(registers))
+        except ValueError as e:
+            self._recordRequestError(SOLARMAN_V5_ENDPOINT,"parse")
+            raise SolisWifiApiParseException(f"Could not parse Solarman V5 inverter data: {e}") from e
+
+        if self._metrics is not None:
+            self._metrics.recordResponse(SOLARMAN_V5_ENDPOINT,parseStart-start,self._client.lastResponseSize,time.perf_counter()-parseStart)
+
+        return inverterData
+
+    async def close(self):
+        await self._client.close()
+        await super().close()
+
+class SolarmanV5FrameError(ValueError):
+    """When a Solarman V5 or Modbus frame is corrupt or does not answer the request"""
+
+class SolarmanV5ConnectionException(aiohttp.ClientConnectionError):
+    """When the Solarman V5 port cannot be reached or drops the request, handled like an unreachable logger"""
@@ -1,19 +1,78 @@
+import dataclasses
 from dataclasses import dataclass
+import functools
+import typing
+from typing import Any
 import aiohttp
 import time
 from datetime import datetime
-import orjson
-import aiofiles
 import asyncio
+from typing import TYPE_CHECKING
 
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-from .const import JSON_CACHE_FILE
+from .const import (
+    CONNECTION_LIMIT_PER_HOST,
+    CONNECTION_KEEPALIVE_TIMEOUT,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONCURRENT_FETCH_FAILURE_THRESHOLD,
+    CONCURRENT_FETCH_RETRY_INTERVAL,
+    SYSTEM_DATA_SCHEMA_VERSION
+)
+from .cgi_schema import CgiSchema,INVERTER_SCHEMA,MONITER_SCHEMA
+from .metrics import PollMetrics
+from .circuit_breaker import CircuitBreaker
+
+if TYPE_CHECKING:
+    from .capture import CaptureWriter
+
+class _DataModel:
+    """Typed dict encode/decode shared by the slotted data models"""
+    __slots__=()
+
+    def to_dict(self) -> dict[str,Any]:
+        data={}
+        for name,_ in _fieldTypes(type(self)):
+            value=getattr(self,name)
+            data[name]=value.isoformat() if isinstance(value,datetime) else value
+        return data
 
-@dataclass
-class InverterData:
+    @classmethod
+    def from_dict(cls,data:dict):
+        """Build from to_dict output, unknown keys are ignored, missing keys take the field default and wrong types raise TypeError"""
+        return cls(**{name:_decodeValue(cls,name,types,data[name]) for name,types in _fieldTypes(cls) if name in data})
+
+@functools.cache
+def _fieldTypes(cls:type) -> tuple[tuple[str,tuple[type,...]],...]:
+    hints=typing.get_type_hints(cls)
+    return tuple((field.name,typing.get_args(hints[field.name]) or (hints[field.name],)) for field in dataclasses.fields(cls))
+
+def _decodeValue(cls:type,name:str,types:tuple[type,...],value:Any) -> Any:
+    if value is None:
+        if type(None) in types:
+            return None
+    elif datetime in types:
+        if isinstance(value,datetime):
+            return value
+        if isinstance(value,str):
+            return datetime.fromisoformat(value)
+    elif isinstance(value,bool):
+        #bool is an int, only accept it where a bool is expected
+        if bool in types:
+            return value
+    elif float in types and isinstance(value,(int,float)):
+        return float(value)
+    elif isinstance(value,types):
+        return value
+
+    raise TypeError(f"{cls.__name__}.{name} cannot be {value!r}")
+
+@dataclass(slots=True,frozen=True)
+class InverterData(_DataModel):
     serial_number: str
     firmware_version: str|None
     model: str
@@ -21,21 +80,11 @@ class InverterData:
     current_power: float
     daily_power_yield: float
     alerts: bool|None
+    #Lifetime energy in kWh, only read over Solarman V5, inverter.cgi has no usable total
+    total_power_yield: float|None=None
 
-    @classmethod
-    def from_dict(cls,data:dict):
-        return cls(
-            serial_number=data["serial_number"],
-            firmware_version=data["firmware_version"],
-            model=data["model"],
-            temperature=data["temperature"],
-            current_power=data["current_power"],
-            daily_power_yield=data["daily_power_yield"],
-            alerts=data["alerts"],    
-        )
-
-@dataclass
-class WifiDataLoggerData:
+@dataclass(slots=True,frozen=True)
+class WifiDataLoggerData(_DataModel):
     online_status:bool #derived from connectivity to wifi data logger stick over network
     last_seen:datetime
     serial_number:str
@@ -49,32 +98,25 @@ class WifiDataLoggerData:
     remote_server_a:bool|None
     remote_server_b:bool|None
 
-    @classmethod
-    def from_dict(cls,data:dict):
-        return cls(
-            online_status=data["online_status"],
-            last_seen=data["last_seen"],
-            serial_number=data["serial_number"],
-            firmware_version=data["firmware_version"],
-            wireless_ap_mode=data["wireless_ap_mode"],
-            wireless_sta_mode=data["wireless_sta_mode"],
-            router_ssid=data["router_ssid"],
-            signal_quality=data["signal_quality"],
-            ip_address=data["ip_address"],
-            mac_address=data["mac_address"],
-            remote_server_a=data["remote_server_a"],
-            remote_server_b=data["remote_server_b"],   
-        )
-        
-
-@dataclass
+@dataclass(slots=True,frozen=True)
 class SystemData:
 
     inverter:InverterData
     wifi_logger:WifiDataLoggerData
 
+    def to_dict(self) -> dict[str,Any]:
+        return {
+            "schema_version":SYSTEM_DATA_SCHEMA_VERSION,
+            "inverter":self.inverter.to_dict(),
+            "wifi_logger":self.wifi_logger.to_dict()
+        }
+
     @classmethod
     def from_dict(cls,data:dict):
+        #Data written before versioning has no schema_version
+        version=data.get("schema_version",1)
+        if not isinstance(version,int) or version > SYSTEM_DATA_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported SystemData schema version {version!r}")
 
         return cls(
             inverter=InverterData.from_dict(data["inverter"]),
@@ -83,135 +125,172 @@ class SystemData:
 
 class SolisWifiApi():
 
-    def __init__(self,hostname:str,username:str,password:str) -> None:
+    def __init__(self,hostname:str,username:str,password:str,session:aiohttp.ClientSession|None=None,maxConcurrentRequests:int=DEFAULT_MAX_CONCURRENT_REQUESTS,metrics:PollMetrics|None=None,circuitBreaker:CircuitBreaker|None=None,capture:"CaptureWriter|None"=None) -> None:
         
-        _LOGGER.info((hostname,username,password))
-        self._session = aiohttp.ClientSession(base_url=hostname,auth=aiohttp.BasicAuth(username,password))
+        _LOGGER.debug("Connecting to %s as %s",hostname,username)
+        self._baseUrl=hostname.rstrip("/")
+        self._auth=aiohttp.BasicAuth(username,password)
+
+        #A session passed in is owned (and closed) by the caller
+        self._ownsSession=session is None
+        self._session=session if session else SolisWifiApi.createSession()
+
+        #Some stick firmwares fall over under parallel requests, so cap them per logger
+        self._requestSemaphore=asyncio.Semaphore(max(1,maxConcurrentRequests))
+        self._concurrentFetch=maxConcurrentRequests > 1
+        #Polls in a row that failed under concurrent requests, and when sequential requests are due to end
+        self._concurrencyFailures=0
+        self._sequentialUntil:float|None=None
+
+        #Optional per endpoint latency, payload size and error counters
+        self._metrics=metrics
+
+        #Separate connect and read timeouts so a hanging stick fails fast, and an optional circuit breaker to stop calling it,
+        #its owner records the outcome of each poll
+        self._timeout=aiohttp.ClientTimeout(total=None,sock_connect=CONNECT_TIMEOUT,sock_read=READ_TIMEOUT)
+        self._circuitBreaker=circuitBreaker
+
+        #Optional copy of every raw response body, for replaying what a misbehaving stick sent
+        self._capture=capture
+
+    @staticmethod
+    def createSession() -> aiohttp.ClientSession:
+        """Create a session with a small keep-alive connection pool suited to the logger stick"""
+        connector=aiohttp.TCPConnector(
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT
+        )
+        return aiohttp.ClientSession(connector=connector)
    
     async def getSystemData(self) -> SystemData:
+
+        if self._concurrentFetch and self._sequentialUntil is not None and time.monotonic() >= self._sequentialUntil:
+            _LOGGER.debug(f"Retrying concurrent requests to logger {self._baseUrl}")
+            self._sequentialUntil=None
+
+        if self._concurrentFetch and self._sequentialUntil is None:
+            results = await asyncio.gather(self.getInverterData(),self.getWifiDataLoggerData(),return_exceptions=True)
+            errors = [result for result in results if isinstance(result,BaseException)]
+
+            if not errors:
+                self._concurrencyFailures=0
+                return SystemData(results[0],results[1])
+
+            if not all(self._isConcurrencyFailure(error) for error in errors):
+                raise errors[0]
+
+            #Connection was accepted but dropped, the stick may be choking on parallel requests or the link is weak,
+            #retry this poll sequentially and only stay sequential once it keeps happening
+            self._concurrencyFailures+=1
+            if self._concurrencyFailures >= CONCURRENT_FETCH_FAILURE_THRESHOLD:
+                _LOGGER.warning(f"Logger {self._baseUrl} failed under concurrent requests {self._concurrencyFailures} polls in a row ({errors[0]!r}), "
+                                f"falling back to sequential requests for {CONCURRENT_FETCH_RETRY_INTERVAL}s")
+                self._concurrencyFailures=0
+                self._sequentialUntil=time.monotonic()+CONCURRENT_FETCH_RETRY_INTERVAL
+
         inverter_data = await self.getInverterData()
         wifi_logger_data = await self.getWifiDataLoggerData() 
 
         return SystemData(inverter_data,wifi_logger_data)   
 
-    async def getInverterData(self) -> InverterData:
+    @staticmethod
+    def _isConcurrencyFailure(error:BaseException) -> bool:
+        #Refused or unreachable connections mean the stick is offline, not overloaded, a read timeout is a hung stick
+        #and a body that does not parse says nothing about how it was requested
+        if isinstance(error,(aiohttp.ClientConnectorError,aiohttp.ServerTimeoutError)):
+            return False
 
-        inverterDataRaw= await self._loadDataAndParseResponse("inverter","Inverter",8)
-
-        return InverterData(
-            inverterDataRaw[0],
-            inverterDataRaw[1],
-            inverterDataRaw[2],
-            float(inverterDataRaw[3]),
-            float(inverterDataRaw[4]),
-            float(inverterDataRaw[5]),
-            #Data in element 6 is 'Total yield' which only show value 'd'??
-            True if inverterDataRaw[7] == "YES" else False
-        )
+        return isinstance(error,(
+            aiohttp.ServerDisconnectedError,
+            aiohttp.ClientOSError,
+            aiohttp.ClientPayloadError
+        ))
 
+    async def getInverterData(self) -> InverterData:
 
+        inverterData= await self._loadDataAndParseResponse(INVERTER_SCHEMA)
+
+        return InverterData(**inverterData)
 
     async def getWifiDataLoggerData(self) -> WifiDataLoggerData:    
         
-        monitorDataRaw= await self._loadDataAndParseResponse("moniter","Wifi Data Logger",13)
+        monitorData= await self._loadDataAndParseResponse(MONITER_SCHEMA)
 
         return WifiDataLoggerData(
-            True,
-            datetime.now(),
-            monitorDataRaw[0],
-            monitorDataRaw[1],
-            True if monitorDataRaw[2] == "Enable" else False,
-            #Data in elements 3-5 are Null, do not know what they are
-            True if monitorDataRaw[6] == "Enable" else False,
-            monitorDataRaw[7],
-            int(monitorDataRaw[8]),
-            monitorDataRaw[9],
-            monitorDataRaw[10],
-            True if monitorDataRaw[11] == "Connected" else False,
-            True if monitorDataRaw[12] == "Connected" else False
+            online_status=True,
+            last_seen=datetime.now(),
+            **monitorData
         )
     
-    async def getOffLineData(self,last_known_system_data:SystemData) -> SystemData:
-
-        if last_known_system_data == None:
-            last_known_system_data= await self._getCachedData()
-
-        inverter_data = InverterData(
-            last_known_system_data.inverter.serial_number if last_known_system_data else "",
-            None,
-            last_known_system_data.inverter.model if last_known_system_data else "",
-            0,
-            0,
-            0,
-            None
-        )
-
-        wifi_logger_data=WifiDataLoggerData(
-            False,
-            last_known_system_data.wifi_logger.last_seen if last_known_system_data else datetime.min,
-            last_known_system_data.wifi_logger.serial_number if last_known_system_data else "",
-            None,
-            None,
-            None,
-            None,
-            0,
-            last_known_system_data.wifi_logger.ip_address if last_known_system_data else "",
-            last_known_system_data.wifi_logger.mac_address if last_known_system_data else "",
-            None,
-            None
-        )
-
-        return SystemData(inverter_data,wifi_logger_data)
-
-    async def _getCachedData(self) -> SystemData | None:
-
-        try:
-            async with aiofiles.open(JSON_CACHE_FILE, mode='rb') as f:
-                content = await f.read()
-                system_data_dict=orjson.loads(content)
-                system_data=SystemData.from_dict(system_data_dict)
-                return system_data
-        except OSError:
-            #await asyncio.sleep(0)
-            return None
-
     def _generateTimeToken(self) -> str:
         return str(int(time.time()))
     
-    async def _loadDataAndParseResponse(self,dataSource:str,dataSourceName:str,dataExpectedLength:int)-> list[str]:
-        response= await self._session.get("/{dataSource}.cgi?t={time}".format(dataSource=dataSource,time=self._generateTimeToken()))
+    async def _loadDataAndParseResponse(self,schema:CgiSchema)-> dict[str,Any]:
+        self._checkCircuit(schema.dataSource,schema.dataSourceName)
 
-        response.raise_for_status()
+        start=time.perf_counter()
+        try:
+            try:
+                responseBody = await self._loadResponseBody(schema.dataSource)
+            except aiohttp.ServerDisconnectedError:
+                #The stick drops idle keep-alive connections, retry once on a fresh connection
+                _LOGGER.debug(f"Pooled connection closed by logger, retrying {schema.dataSourceName} request")
+                responseBody = await self._loadResponseBody(schema.dataSource)
+        except aiohttp.ClientResponseError:
+            self._recordRequestError(schema.dataSource,"http")
+            raise
+        except aiohttp.ClientError:
+            self._recordRequestError(schema.dataSource,"connection")
+            raise
+
+        parseStart=time.perf_counter()
+        if self._capture is not None:
+            self._capture.record(schema.dataSource,parseStart-start,responseBody)
 
-        responseText = await response.text()
+        try:
+            parsed=schema.parse(responseBody)
+        except ValueError as e:
+            self._recordRequestError(schema.dataSource,"parse")
+            raise SolisWifiApiParseException(f"Could not parse {schema.dataSourceName} data ({e}), please check connection") from e
 
-        dataRaw=self._parseResponseText(responseText)
-        
-        if len(dataRaw) != dataExpectedLength:
-            raise SolisWifiApiParseException(f"Could not parse {dataSourceName} data, please check connection")
+        if self._metrics is not None:
+            self._metrics.recordResponse(schema.dataSource,parseStart-start,len(responseBody),time.perf_counter()-parseStart)
 
-        return dataRaw
+        return parsed
 
-    def _parseResponseText(self,responseText:str)-> list[str]:
+    def _checkCircuit(self,dataSource:str,dataSourceName:str) -> None:
+        if self._circuitBreaker is not None and not self._circuitBreaker.allowRequest():
+            self._recordRequestError(dataSource,"circuit_open")
+            raise SolisWifiApiCircuitOpenException(f"Not requesting {dataSourceName} data, logger failing, next attempt in {self._circuitBreaker.retryAfter():.0f}s")
 
-        #Removing NUL characters from response
-        cleanedup=responseText.replace("\x00","").removesuffix(";\r\n")    
+    def _recordRequestError(self,dataSource:str,kind:str) -> None:
+        if self._metrics is not None:
+            self._metrics.recordRequestError(dataSource,kind)
 
-        return cleanedup.split(";")
+    async def _loadResponseBody(self,dataSource:str) -> bytes:
+        url="{baseUrl}/{dataSource}.cgi?t={time}".format(baseUrl=self._baseUrl,dataSource=dataSource,time=self._generateTimeToken())
+
+        async with self._requestSemaphore:
+            async with self._session.get(url,auth=self._auth,timeout=self._timeout) as response:
+                response.raise_for_status()
+                #Raw bytes, the schema decodes only the text fields
+                return await response.read()
 
     async def close(self):
-        await self._session.close()
+        if self._ownsSession:
+            await self._session.close()
 
 class SolisWifiApiManager:
 
-    def __init__(self,hostname:str,username:str,password:str) -> None:
+    def __init__(self,hostname:str,username:str,password:str,maxConcurrentRequests:int=DEFAULT_MAX_CONCURRENT_REQUESTS) -> None:
         
         self._hostname=hostname
         self._username=username
         self._password=password
+        self._maxConcurrentRequests=maxConcurrentRequests
 
     async def __aenter__(self) -> SolisWifiApi:
-        self.soliswifiapi=SolisWifiApi(self._hostname,self._username,self._password)
+        self.soliswifiapi=SolisWifiApi(self._hostname,self._username,self._password,maxConcurrentRequests=self._maxConcurrentRequests)
         return self.soliswifiapi
 
     async def __aexit__(self, exc_type, exc, tb):
@@ -219,3 +298,6 @@ class SolisWifiApiManager:
 
 class SolisWifiApiParseException(Exception):
     """When the response payload cannot be parsed"""
+
+class SolisWifiApiCircuitOpenException(aiohttp.ClientConnectionError):
+    """Raised without contacting the logger while its circuit is open, handled like an unreachable logger"""
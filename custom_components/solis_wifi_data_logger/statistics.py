@@ -0,0 +1,173 @@
+"""Hourly energy and power statistics compiled from the polled samples, for writing as external statistics.
+
+Energy is the sum of the increases of daily_power_yield, so the inverter's
+reset of its daily counter adds the new day's yield instead of a negative step.
+Any drop after the local day changed, or by more than resetTolerance, is taken
+as the reset, smaller drops are glitches and ignored. Offline placeholders
+report 0 for everything and are not samples at all. Power is the time weighted
+mean, min and max of current_power, each sample holding until the next one at
+most maxGap later. After a restart the compiler carries on from the hour
+following the last one written, which it leaves as it was.
+"""
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from .solis_wifi_api import SystemData
+from .const import STATISTICS_PERIOD,STATISTICS_MAX_GAP,STATISTICS_RESET_TOLERANCE
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(slots=True,frozen=True)
+class HourlyStatistics:
+    #Start of the hour in epoch seconds
+    start:float
+    #Power in W
+    mean:float
+    minimum:float
+    maximum:float
+    #daily_power_yield at the end of the hour and the energy since the statistics began, in kWh
+    state:float
+    sum:float
+
+class HourlyStatisticsCompiler:
+    """Folds online samples into hourly statistics, completed hours queue until drained"""
+
+    def __init__(self,maxGap:float=STATISTICS_MAX_GAP,period:int=STATISTICS_PERIOD,resetTolerance:float=STATISTICS_RESET_TOLERANCE) -> None:
+        self._maxGap=maxGap
+        self._period=period
+        self._resetTolerance=resetTolerance
+
+        #Energy
+        self._sum=0.0
+        self._yield:float|None=None
+        self._day:int|None=None
+        self._resetPending=False
+        self.ignoredDrops=0
+
+        #Power of the hour being filled
+        self._hourStart:float|None=None
+        self._integral=0.0
+        self._duration=0.0
+        self._sampleSum=0.0
+        self._sampleCount=0
+        self._minimum=0.0
+        self._maximum=0.0
+        self._empty=True
+        self._lastTime:float|None=None
+        self._lastPower=0.0
+
+        #Samples before this time fall in hours already written
+        self._floor:float|None=None
+        self._completed:list[HourlyStatistics]=[]
+
+    def restore(self,start:float,state:float|None,total:float|None,day:int) -> None:
+        """Continue from the last hour written, so the sum carries on across restarts"""
+        #Only samples from after the restart are left for the hour starting at start, rewriting it would lose the
+        #power before the restart, its energy is counted in the next hour from the restored state instead
+        self._floor=start+self._period
+        self._sum=total or 0.0
+        self._yield=state
+        self._day=day
+
+    def update(self,systemData:SystemData,timestamp:float,day:int) -> None:
+        """Add a poll result taken at the epoch timestamp on the local day ordinal"""
+        if not systemData.wifi_logger.online_status:
+            self._lastTime=None
+            return
+
+        if self._floor is not None and timestamp < self._floor:
+            return
+
+        inverter=systemData.inverter
+        power=max(0.0,inverter.current_power)
+
+        #The previous sample holds until this one, split at the hour boundaries it crosses
+        if self._lastTime is not None and 0 < timestamp-self._lastTime <= self._maxGap:
+            start=self._lastTime
+            while start < timestamp:
+                hourStart=start-start%self._period
+                self._advance(hourStart)
+                self._extend(self._lastPower)
+                end=min(timestamp,hourStart+self._period)
+                self._integral+=self._lastPower*(end-start)
+                self._duration+=end-start
+                start=end
+
+        self._advance(timestamp-timestamp%self._period)
+        self._extend(power)
+        self._sampleSum+=power
+        self._sampleCount+=1
+        self._lastTime=timestamp
+        self._lastPower=power
+
+        self._addYield(inverter.daily_power_yield,day)
+
+    def _addYield(self,dailyYield:float,day:int) -> None:
+        if self._day is not None and day != self._day:
+            #The inverter resets its counter on its own clock, the first drop of the new day is the reset
+            self._resetPending=True
+        self._day=day
+
+        if self._yield is None:
+            self._yield=dailyYield
+        elif dailyYield >= self._yield:
+            self._sum+=dailyYield-self._yield
+            self._yield=dailyYield
+        elif self._resetPending or round(self._yield-dailyYield,3) > self._resetTolerance:
+            self._sum+=dailyYield
+            self._yield=dailyYield
+            self._resetPending=False
+        else:
+            _LOGGER.debug(f"Ignoring daily_power_yield dropping from {self._yield} to {dailyYield} kWh")
+            self.ignoredDrops+=1
+
+    def _extend(self,power:float) -> None:
+        if self._empty:
+            self._minimum=power
+            self._maximum=power
+            self._empty=False
+        else:
+            self._minimum=min(self._minimum,power)
+            self._maximum=max(self._maximum,power)
+
+    def _advance(self,hourStart:float) -> None:
+        if self._hourStart is not None and hourStart <= self._hourStart:
+            return
+
+        if not self._empty:
+            self._completed.append(self._current())
+
+        self._hourStart=hourStart
+        self._integral=0.0
+        self._duration=0.0
+        self._sampleSum=0.0
+        self._sampleCount=0
+        self._empty=True
+
+    def _current(self) -> HourlyStatistics:
+        mean=self._integral/self._duration if self._duration else self._sampleSum/max(1,self._sampleCount)
+        return HourlyStatistics(self._hourStart,mean,self._minimum,self._maximum,self._yield or 0.0,self._sum)
+
+    def drain(self,includeCurrent:bool=False) -> list[HourlyStatistics]:
+        """Completed hours not drained yet, oldest first, includeCurrent adds the hour being filled so far"""
+        completed=self._completed
+        self._completed=[]
+
+        if includeCurrent and not self._empty:
+            completed.append(self._current())
+
+        return completed
+
+    @property
+    def pending(self) -> int:
+        return len(self._completed)
+
+    def toDict(self) -> dict[str,Any]:
+        return {
+            "sum":self._sum,
+            "daily_power_yield":self._yield,
+            "hour_start":self._hourStart,
+            "pending_hours":len(self._completed),
+            "ignored_drops":self.ignoredDrops
+        }